@@ -4,140 +4,348 @@ import logging
 from typing import List
 import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Select, bindparam, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
-from app.core.database import get_db
-from app.models.database import Customer, IncomingCustomer
+from app.core.config import Settings, get_settings
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.models.database import Customer, HalfVec, IncomingCustomer
 from app.models.schemas import (
-    CustomerCreate, CustomerResponse, IncomingCustomerCreate, 
-    IncomingCustomerResponse, SimilaritySearchRequest, SimilaritySearchResult
+    CustomerCreate, CustomerCreateList, CustomerResponse, CustomerResponseList, IncomingCustomerCreate,
+    IncomingCustomerCreateList, IncomingCustomerResponse, IncomingCustomerResponseList,
+    SimilaritySearchRequest, SimilaritySearchResult
 )
 from app.services.embedding_service import embedding_service
+from app.services.matching.fuzzy_matcher import company_name_index
+from app.services.query_cache import match_cache, search_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Rows fetched per round-trip when streaming list responses
+STREAM_YIELD_PER = 100
+
+
+def _response_columns(entity, response_model: type[BaseModel]):
+    """load_only() option for the columns a response model exposes
+    
+    Keeps the 1536-dim embedding columns (~3 KB each as halfvec) out of
+    queries whose responses never include them.
+    """
+    return load_only(*(getattr(entity, name) for name in response_model.model_fields))
+
+
+async def _stream_json_list(statement: Select, list_adapter: TypeAdapter) -> StreamingResponse:
+    """Stream ORM query results as a JSON array, holding one partition in memory at a time
+    
+    Each partition is validated and serialised with one list_adapter call,
+    dropping unset fields. The query runs on its own AsyncSessionLocal()
+    session because the response body is produced after the endpoint (and
+    its dependencies) have returned, so dependency_overrides[get_async_db]
+    does not apply to streamed lists. The statement is executed and its
+    first partition serialised before the response starts, so setup errors
+    still become a 500; a later failure is logged and aborts the response
+    instead of closing a truncated array.
+    """
+    def encode(partition) -> bytes:
+        models = list_adapter.validate_python(partition, from_attributes=True)
+        # Strip the brackets: partitions are joined into one array
+        return list_adapter.dump_json(models, exclude_unset=True)[1:-1]
+    
+    session = AsyncSessionLocal()
+    try:
+        result = await session.stream_scalars(
+            statement.execution_options(yield_per=STREAM_YIELD_PER)
+        )
+        partitions = result.partitions()
+        try:
+            first_chunk = encode(await partitions.__anext__())
+        except StopAsyncIteration:
+            first_chunk = b""
+    except Exception as e:
+        await session.close()
+        logger.error(f"Error listing records: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def generate():
+        try:
+            yield b"[" + first_chunk
+            async for partition in partitions:
+                yield b"," + encode(partition)
+            yield b"]"
+        except Exception as e:
+            logger.error(f"Error streaming records, response aborted: {e}")
+            raise
+        finally:
+            await session.close()
+    
+    return StreamingResponse(generate(), media_type="application/json")
+
 
 @router.post("/", response_model=CustomerResponse)
-async def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
+async def create_customer(customer: CustomerCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new customer with embeddings"""
     try:
-        # Generate embeddings
-        company_embedding, profile_embedding = embedding_service.generate_customer_embeddings(
-            customer.model_dump()
-        )
+        customer_data = customer.model_dump()
         
-        # Create customer record
-        db_customer = Customer(
-            **customer.model_dump(),
-            company_name_embedding=company_embedding,
-            full_profile_embedding=profile_embedding
+        # Both embeddings come from one batched request
+        company_embedding, profile_embedding = await embedding_service.generate_customer_embeddings_async(
+            customer_data, db
         )
         
-        db.add(db_customer)
-        db.commit()
-        db.refresh(db_customer)
+        # Create customer record with INSERT ... RETURNING instead of add + refresh
+        db_customer = await db.scalar(
+            insert(Customer).returning(Customer),
+            {
+                **customer_data,
+                "company_name_embedding": company_embedding,
+                "full_profile_embedding": profile_embedding
+            }
+        )
+        await db.commit()
         
+        search_cache.clear()
+        match_cache.clear()
+        company_name_index.clear()
         logger.info(f"Created customer: {customer.company_name}")
         return db_customer
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating customer: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/bulk", response_model=List[CustomerResponse])
+async def create_customers_bulk(customers: List[CustomerCreate], db: AsyncSession = Depends(get_async_db)):
+    """Create many customers with batched embedding generation"""
+    try:
+        customers_data = CustomerCreateList.dump_python(customers)
+        
+        # Generate all embeddings in batched requests instead of two calls per customer
+        embeddings = await embedding_service.generate_customer_embeddings_batch_async(customers_data, db)
+        
+        rows = [
+            {
+                **data,
+                "company_name_embedding": company_embedding,
+                "full_profile_embedding": profile_embedding
+            }
+            for data, (company_embedding, profile_embedding) in zip(customers_data, embeddings)
+        ]
+        
+        result = await db.scalars(insert(Customer).returning(Customer, sort_by_parameter_order=True), rows)
+        db_customers = result.all()
+        await db.commit()
+        
+        search_cache.clear()
+        match_cache.clear()
+        company_name_index.clear()
+        logger.info(f"Created {len(db_customers)} customers in bulk")
+        return db_customers
+        
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error creating customers in bulk: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# response_model only documents the streamed body; _stream_json_list serialises it
 @router.get("/", response_model=List[CustomerResponse])
-async def list_customers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def list_customers(skip: int = 0, limit: int = 100):
     """List all customers"""
-    customers = db.query(Customer).offset(skip).limit(limit).all()
-    return customers
+    statement = (
+        select(Customer)
+        .options(_response_columns(Customer, CustomerResponse))
+        .offset(skip)
+        .limit(limit)
+    )
+    return await _stream_json_list(statement, CustomerResponseList)
 
 
 @router.post("/incoming", response_model=IncomingCustomerResponse)
-async def create_incoming_customer(customer: IncomingCustomerCreate, db: Session = Depends(get_db)):
+async def create_incoming_customer(customer: IncomingCustomerCreate, db: AsyncSession = Depends(get_async_db)):
     """Create an incoming customer request with embeddings"""
     try:
-        # Generate embeddings
-        company_embedding, profile_embedding = embedding_service.generate_customer_embeddings(
-            customer.model_dump()
-        )
+        customer_data = customer.model_dump()
         
-        # Create incoming customer record
-        db_incoming = IncomingCustomer(
-            **customer.model_dump(),
-            company_name_embedding=company_embedding,
-            full_profile_embedding=profile_embedding
+        # Both embeddings come from one batched request
+        company_embedding, profile_embedding = await embedding_service.generate_customer_embeddings_async(
+            customer_data, db
         )
         
-        db.add(db_incoming)
-        db.commit()
-        db.refresh(db_incoming)
+        # Create incoming customer record with INSERT ... RETURNING instead of add + refresh
+        db_incoming = await db.scalar(
+            insert(IncomingCustomer).returning(IncomingCustomer),
+            {
+                **customer_data,
+                "company_name_embedding": company_embedding,
+                "full_profile_embedding": profile_embedding
+            }
+        )
+        await db.commit()
         
         logger.info(f"Created incoming customer request: {customer.company_name}")
         return db_incoming
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating incoming customer: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/incoming/bulk", response_model=List[IncomingCustomerResponse])
+async def create_incoming_customers_bulk(
+    customers: List[IncomingCustomerCreate],
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many incoming customer requests with batched embedding generation"""
+    try:
+        customers_data = IncomingCustomerCreateList.dump_python(customers)
+        
+        # Generate all embeddings in batched requests instead of two calls per customer
+        embeddings = await embedding_service.generate_customer_embeddings_batch_async(customers_data, db)
+        
+        rows = [
+            {
+                **data,
+                "company_name_embedding": company_embedding,
+                "full_profile_embedding": profile_embedding
+            }
+            for data, (company_embedding, profile_embedding) in zip(customers_data, embeddings)
+        ]
+        
+        result = await db.scalars(insert(IncomingCustomer).returning(IncomingCustomer, sort_by_parameter_order=True), rows)
+        db_incoming = result.all()
+        await db.commit()
+        
+        logger.info(f"Created {len(db_incoming)} incoming customer requests in bulk")
+        return db_incoming
+        
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error creating incoming customers in bulk: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# response_model only documents the streamed body; _stream_json_list serialises it
 @router.get("/incoming", response_model=List[IncomingCustomerResponse])
-async def list_incoming_customers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def list_incoming_customers(skip: int = 0, limit: int = 100):
     """List all incoming customers"""
-    incoming_customers = db.query(IncomingCustomer).offset(skip).limit(limit).all()
-    return incoming_customers
+    statement = (
+        select(IncomingCustomer)
+        .options(_response_columns(IncomingCustomer, IncomingCustomerResponse))
+        .offset(skip)
+        .limit(limit)
+    )
+    return await _stream_json_list(statement, IncomingCustomerResponseList)
 
 
 @router.post("/search", response_model=List[SimilaritySearchResult])
 async def search_similar_customers(
     search_request: SimilaritySearchRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    settings: Settings = Depends(get_settings)
 ):
     """Search for similar customers using text query"""
     try:
+        cache_params = (search_request.similarity_threshold, search_request.max_results)
+        if settings.enable_search_cache:
+            cached = search_cache.get_by_text(search_request.query_text, cache_params)
+            if cached is not None:
+                return cached
+        
         # Generate embedding for search query
-        query_embedding = embedding_service.generate_text_embedding(search_request.query_text)
+        query_embedding = await embedding_service.generate_text_embedding_async(search_request.query_text)
         
-        # Convert numpy array to list if needed
-        if isinstance(query_embedding, np.ndarray):
-            query_embedding = query_embedding.tolist()
+        if settings.enable_search_cache:
+            cached = search_cache.get_similar(query_embedding, cache_params)
+            if cached is not None:
+                # Remember this phrasing too so repeats skip the embedding call
+                search_cache.put(search_request.query_text, query_embedding, cache_params, cached)
+                return cached
         
-        # Search for similar customers using vector similarity
-        from sqlalchemy import text
+        # Bound through the pgvector halfvec type, so no CAST is needed in SQL
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        
+        # Matryoshka prefix used by the first stage, renormalised to unit length
+        prefix_embedding = query_embedding[:settings.search_prefilter_dimensions]
+        prefix_norm = np.linalg.norm(prefix_embedding)
+        if prefix_norm > 0:
+            prefix_embedding = prefix_embedding / prefix_norm
+        
+        # Two-stage search: shortlist candidates on the 256-dim prefix column
+        # (HNSW index on full_profile_embedding_256), then re-rank them with
+        # the full embedding. Each stage is an ORDER BY distance LIMIT k
+        # query, and the threshold is applied to the final k rows only.
+        # Only ids and embeddings flow through the stages; display columns are
+        # joined for the final rows.
         query = text("""
+            WITH candidates AS (
+                SELECT customer_id, full_profile_embedding
+                FROM customer_data.customers 
+                ORDER BY full_profile_embedding_256 <=> :prefix_embedding
+                LIMIT :candidate_count
+            ),
+            topk AS (
+                SELECT 
+                    customer_id,
+                    full_profile_embedding <=> :query_embedding AS distance
+                FROM candidates
+                ORDER BY distance
+                LIMIT :max_results
+            )
             SELECT 
-                customer_id, company_name, contact_name, email, city, country,
-                1 - (full_profile_embedding <=> CAST(:query_embedding AS vector(1536))) as similarity_score
-            FROM customer_data.customers 
-            WHERE 1 - (full_profile_embedding <=> CAST(:query_embedding AS vector(1536))) > :threshold
-            ORDER BY full_profile_embedding <=> CAST(:query_embedding AS vector(1536))
-            LIMIT :max_results
-        """)
-        
-        results = db.execute(
+                c.customer_id, c.company_name, c.contact_name, c.email, c.city, c.country,
+                1 - t.distance AS similarity_score
+            FROM topk t
+            JOIN customer_data.customers c ON c.customer_id = t.customer_id
+            WHERE t.distance < :max_distance
+            ORDER BY t.distance
+        """).bindparams(
+            bindparam("query_embedding", type_=HalfVec(1536)),
+            bindparam("prefix_embedding", type_=HalfVec(settings.search_prefilter_dimensions))
+        )
+        
+        # An HNSW scan returns at most ef_search rows, so widen it to the shortlist
+        candidate_count = search_request.max_results * settings.search_candidate_multiplier
+        await db.execute(
+            text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+            {"ef_search": str(max(settings.hnsw_ef_search, candidate_count))}
+        )
+        result = await db.execute(
             query,
             {
                 "query_embedding": query_embedding,
-                "threshold": search_request.similarity_threshold,
+                "prefix_embedding": prefix_embedding,
+                "candidate_count": candidate_count,
+                "max_distance": 1 - search_request.similarity_threshold,
                 "max_results": search_request.max_results
             }
-        ).fetchall()
+        )
+        results = result.mappings().all()
         
-        return [
+        search_results = [
             SimilaritySearchResult(
-                customer_id=row.customer_id,
-                company_name=row.company_name,
-                contact_name=row.contact_name,
-                email=row.email,
-                city=row.city,
-                country=row.country,
-                similarity_score=float(row.similarity_score)
+                customer_id=row["customer_id"],
+                company_name=row["company_name"],
+                contact_name=row["contact_name"],
+                email=row["email"],
+                city=row["city"],
+                country=row["country"],
+                similarity_score=float(row["similarity_score"])
             )
             for row in results
         ]
         
+        if settings.enable_search_cache:
+            search_cache.put(search_request.query_text, query_embedding, cache_params, search_results)
+        
+        return search_results
+        
     except Exception as e:
         logger.error(f"Error searching customers: {e}")
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
@@ -1,27 +1,39 @@
 """Display endpoints for Customer Matching POC - Enhanced Results Display"""
 
 import logging
-from typing import Optional
+from enum import Enum
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.schemas import (
     MatchSummaryDisplay, PaginationParams, MatchFilters, 
     DetailedMatchDisplay, BulkMatchDisplay, MatchType, ProcessingStatus
 )
-from app.services.display_service import MatchDisplayService
+from app.services.display_service import MatchDisplayService, get_display_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize display service
-display_service = MatchDisplayService()
+# Lookup tables for the comma-separated filter query parameters
+MATCH_TYPES = {match_type.value: match_type for match_type in MatchType}
+PROCESSING_STATUSES = {status.value: status for status in ProcessingStatus}
+
+
+def _parse_enum_list(raw: str, lookup: Dict[str, Enum], label: str) -> List[Enum]:
+    """Parse a comma-separated filter value, rejecting all unknown tokens at once"""
+    tokens = [token.strip() for token in raw.split(',')]
+    invalid = [token for token in tokens if token not in lookup]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid {label}(s): {', '.join(invalid)}")
+    return [lookup[token] for token in tokens]
 
 
 @router.get("/matches/summary", response_model=MatchSummaryDisplay)
 async def get_matches_summary(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    display_service: MatchDisplayService = Depends(get_display_service)
 ):
     """Get summary view of all matching results with key metrics
     
@@ -35,7 +47,7 @@ async def get_matches_summary(
     try:
         logger.info("Getting matches summary")
         
-        summary = display_service.get_match_summary(db)
+        summary = await db.run_sync(display_service.get_match_summary)
         
         logger.info(f"Retrieved summary with {summary.total_matches} total matches")
         return summary
@@ -51,7 +63,8 @@ async def get_matches_summary(
 @router.get("/matches/detailed/{request_id}", response_model=DetailedMatchDisplay)
 async def get_detailed_match_display(
     request_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    display_service: MatchDisplayService = Depends(get_display_service)
 ):
     """Get detailed match display for a specific incoming customer
     
@@ -69,7 +82,9 @@ async def get_detailed_match_display(
     try:
         logger.info(f"Getting detailed match display for request_id: {request_id}")
         
-        detailed_display = display_service.get_detailed_match_view(request_id, db)
+        detailed_display = await db.run_sync(
+            lambda session: display_service.get_detailed_match_view(request_id, session)
+        )
         
         logger.info(f"Retrieved detailed display with {len(detailed_display.matched_customers)} matches")
         return detailed_display
@@ -85,15 +100,20 @@ async def get_detailed_match_display(
         )
 
 
-@router.get("/matches/bulk", response_model=BulkMatchDisplay)
+@router.get("/matches/bulk", response_model=BulkMatchDisplay, response_model_exclude_unset=True)
 async def get_bulk_matches(
     # Pagination parameters
     page: int = Query(1, ge=1, description="Page number (starting from 1)"),
     page_size: int = Query(25, ge=1, le=100, description="Number of items per page (1-100)"),
     
     # Sorting parameters
-    sort_by: str = Query("confidence_level", description="Field to sort by (confidence_level, created_date, company_name)"),
-    sort_order: str = Query("desc", description="Sort order (asc, desc)"),
+    sort_by: str = Query(
+        "confidence_level",
+        pattern="^(confidence_level|similarity_score|created_date|company_name)$",
+        description="Field to sort by (confidence_level, similarity_score, created_date, company_name)"
+    ),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order (asc, desc)"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor of the previous page); overrides page"),
     
     # Filter parameters
     confidence_min: Optional[float] = Query(None, ge=0, le=1, description="Minimum confidence level (0-1)"),
@@ -102,7 +122,8 @@ async def get_bulk_matches(
     processing_status: Optional[str] = Query(None, description="Comma-separated processing statuses to filter by"),
     reviewed: Optional[bool] = Query(None, description="Filter by review status"),
     
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    display_service: MatchDisplayService = Depends(get_display_service)
 ):
     """Get bulk display of matches with filtering and pagination
     
@@ -111,6 +132,7 @@ async def get_bulk_matches(
         page_size: Number of items per page (1-100)
         sort_by: Field to sort by
         sort_order: Sort order (asc/desc)
+        cursor: Keyset cursor returned as next_cursor by the previous page
         confidence_min: Minimum confidence level filter
         confidence_max: Maximum confidence level filter
         match_types: Comma-separated match types filter
@@ -128,23 +150,19 @@ async def get_bulk_matches(
         logger.info(f"Getting bulk matches - page: {page}, size: {page_size}, sort: {sort_by} {sort_order}")
         
         # Build pagination params
-        pagination = PaginationParams(page=page, page_size=page_size)
+        pagination = PaginationParams(
+            page=page, page_size=page_size, sort_by=sort_by, sort_order=sort_order, cursor=cursor
+        )
         
         # Parse match types
         match_type_list = None
         if match_types:
-            try:
-                match_type_list = [MatchType(mt.strip()) for mt in match_types.split(',')]
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=f"Invalid match type: {str(e)}")
-                
+            match_type_list = _parse_enum_list(match_types, MATCH_TYPES, "match type")
+        
         # Parse processing status
         status_list = None
         if processing_status:
-            try:
-                status_list = [ProcessingStatus(ps.strip()) for ps in processing_status.split(',')]
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=f"Invalid processing status: {str(e)}")
+            status_list = _parse_enum_list(processing_status, PROCESSING_STATUSES, "processing status")
         
         # Build filters with all parameters
         filters = MatchFilters(
@@ -160,13 +178,18 @@ async def get_bulk_matches(
         )
         
         # Get bulk matches
-        bulk_display = display_service.get_bulk_matches(filters, pagination, db)
+        bulk_display = await db.run_sync(
+            lambda session: display_service.get_bulk_matches(filters, pagination, session)
+        )
         
         logger.info(f"Retrieved {len(bulk_display.matches)} matches out of {bulk_display.total_count} total")
         return bulk_display
         
     except HTTPException:
         raise
+    except ValueError as e:
+        logger.warning(f"Invalid bulk matches request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting bulk matches: {str(e)}")
         raise HTTPException(
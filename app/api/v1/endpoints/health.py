@@ -1,21 +1,54 @@
 """Health check endpoints for Customer Matching POC"""
 
+import asyncio
+import logging
 from datetime import datetime
-from fastapi import APIRouter
+from typing import Dict
+from fastapi import APIRouter, Depends
 
-from app.core.config import settings
-from app.core.database import check_database_connection
+from app.core.config import Settings, get_settings
+from app.core.database import check_database_connection_async
 from app.services.embedding_service import embedding_service
+from app.services.query_cache import match_cache, search_cache
 from app.models.schemas import HealthCheck
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Last known connectivity, kept current by refresh_health_loop
+_health_status: Dict[str, bool] = {}
+
+
+async def _check_health() -> Dict[str, bool]:
+    """Probe the database and Azure OpenAI and remember the outcome"""
+    db_connected, openai_connected = await asyncio.gather(
+        check_database_connection_async(),
+        embedding_service.test_connection_async()
+    )
+    _health_status.update(database_connected=db_connected, openai_connected=openai_connected)
+    return dict(_health_status)
+
+
+async def refresh_health_loop(interval: float):
+    """Refresh the cached health status every interval seconds until cancelled"""
+    while True:
+        try:
+            await _check_health()
+        except Exception as e:
+            logger.error(f"Health refresh failed: {e}")
+        await asyncio.sleep(interval)
+
 
 @router.get("/", response_model=HealthCheck)
-async def health_check():
-    """Health check endpoint"""
-    db_connected = check_database_connection()
-    openai_connected = embedding_service.test_connection()
+async def health_check(settings: Settings = Depends(get_settings)):
+    """Health check endpoint
+    
+    Serves the status kept by the background refresh, so probes do no I/O.
+    Falls back to a live check before the first refresh has completed.
+    """
+    status = dict(_health_status) or await _check_health()
+    db_connected = status["database_connected"]
+    openai_connected = status["openai_connected"]
     
     return HealthCheck(
         status="healthy" if db_connected and openai_connected else "unhealthy",
@@ -23,4 +56,20 @@ async def health_check():
         version=settings.app_version,
         database_connected=db_connected,
         openai_connected=openai_connected
-    ) 
\ No newline at end of file
+    )
+
+
+@router.get("/metrics")
+async def cache_metrics():
+    """In-process cache statistics for the embedding, search and match caches"""
+    return {
+        "embedding_cache": embedding_service.local_cache.cache_info(),
+        "search_cache": {
+            "maxsize": search_cache.max_entries,
+            "currsize": len(search_cache)
+        },
+        "match_cache": {
+            "maxsize": match_cache.max_entries,
+            "currsize": len(match_cache)
+        }
+    }
@@ -1,92 +1,153 @@
 """Matching endpoints for Customer Matching POC"""
 
+import asyncio
 import logging
 import time
 from datetime import datetime
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from functools import lru_cache
+from typing import Callable, List
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, desc, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_db
 from app.models.database import IncomingCustomer, MatchingResult, Customer
-from app.models.schemas import CustomerMatchResponse, MatchResult
+from app.models.schemas import CustomerMatchResponse, IncomingCustomerResponse, MatchResult
+from app.services.display_service import build_match_result
+from app.services.matching.base_matcher import BaseMatcher
 from app.services.matching.matching_service import matching_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Rows fetched per round-trip when streaming matching results
+STREAM_YIELD_PER = 100
 
-@router.post("/{request_id}", response_model=CustomerMatchResponse)
-async def process_customer_matching(request_id: int, db: Session = Depends(get_db)):
-    """Process matching for an incoming customer using hybrid approach"""
-    start_time = time.time()
+# Transaction-local settings for a matching run, applied in one round-trip
+MATCHING_TRANSACTION_SETTINGS = text(
+    "SELECT set_config('statement_timeout', :statement_timeout, true),"
+    " set_config('hnsw.ef_search', :ef_search, true)"
+)
+
+# Incoming customer columns the response and the matchers read; the company
+# name embedding is never needed and the profile embedding only for vector matching
+_INCOMING_COLUMNS = [getattr(IncomingCustomer, name) for name in IncomingCustomerResponse.model_fields]
+_INCOMING_WITHOUT_EMBEDDINGS = load_only(*_INCOMING_COLUMNS)
+_INCOMING_WITH_PROFILE_EMBEDDING = load_only(*_INCOMING_COLUMNS, IncomingCustomer.full_profile_embedding)
+
+
+@lru_cache(maxsize=1)
+def _matching_slots() -> asyncio.Semaphore:
+    """Semaphore capping concurrent matching runs
     
-    try:
-        # Get incoming customer
-        incoming_customer = db.query(IncomingCustomer).filter(
-            IncomingCustomer.request_id == request_id
-        ).first()
-        
-        if not incoming_customer:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Incoming customer with request_id {request_id} not found"
-            )
-        
-        # Process matching using the matching service
-        matches = matching_service.find_matches(incoming_customer, db)
-        
-        # Update processing status
-        incoming_customer.processing_status = "completed"  # type: ignore
-        incoming_customer.processed_date = datetime.fromtimestamp(time.time())  # type: ignore
-        db.commit()
-        
-        processing_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-        
-        return CustomerMatchResponse(
-            incoming_customer=incoming_customer,
-            matches=matches,
-            total_matches=len(matches),
-            processing_time_ms=processing_time
+    Matching holds its connection for the whole run; capping concurrent runs
+    leaves the rest of the pool to short requests. Created on first use,
+    inside the running event loop: on Python 3.9 a semaphore created at
+    import binds to a different loop.
+    """
+    return asyncio.Semaphore(settings.matching_max_concurrency)
+
+
+def _incoming_customer_response(incoming_customer: IncomingCustomer) -> IncomingCustomerResponse:
+    """Response model for an already loaded incoming customer, built without validation"""
+    fields = {name: getattr(incoming_customer, name) for name in IncomingCustomerResponse.model_fields}
+    if fields["annual_revenue"] is not None:
+        # BIGINT cents column read back as dollar Decimals (Cents), float in the schema
+        fields["annual_revenue"] = float(fields["annual_revenue"])
+    return IncomingCustomerResponse.model_construct(**fields)
+
+
+async def _configure_matching_transaction(session: AsyncSession):
+    """Bound every statement of the current matching transaction and set its HNSW search width"""
+    await session.execute(MATCHING_TRANSACTION_SETTINGS, {
+        "statement_timeout": str(int(settings.matching_statement_timeout_ms)),
+        "ef_search": str(int(settings.hnsw_ef_search)),
+    })
+
+
+async def _run_strategy(matcher: BaseMatcher, incoming_customer: IncomingCustomer) -> List[MatchResult]:
+    """Run one matching strategy on its own pooled session and connection"""
+    async with AsyncSessionLocal() as session, session.begin():
+        await _configure_matching_transaction(session)
+        return await session.run_sync(lambda sync_session: matcher.find_matches(incoming_customer, sync_session))
+
+
+async def _find_hybrid_parallel(incoming_customer: IncomingCustomer, db: AsyncSession) -> List[MatchResult]:
+    """Hybrid matching with the exact, vector and fuzzy queries running concurrently
+    
+    Each strategy reads on its own connection, so a run holds up to four
+    pooled connections; results are stored on db in the caller's transaction.
+    """
+    strategy_matches = await asyncio.gather(*(
+        _run_strategy(matcher, incoming_customer)
+        for matcher in (matching_service.exact_matcher, matching_service.vector_matcher, matching_service.fuzzy_matcher)
+    ))
+    all_matches = [match for matches in strategy_matches for match in matches]
+    
+    return await db.run_sync(
+        lambda session: matching_service.result_processor.process_results(
+            all_matches, incoming_customer.request_id, session, commit=False
         )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error processing matching for request_id {request_id}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    )
 
 
-@router.post("/hybrid/{request_id}", response_model=CustomerMatchResponse)
-async def process_customer_matching_hybrid(request_id: int, db: Session = Depends(get_db)):
-    """Process matching for an incoming customer using hybrid approach"""
-    start_time = time.time()
+async def _process_matching(
+    request_id: int,
+    db: AsyncSession,
+    find: Callable[..., List[MatchResult]],
+    label: str,
+    needs_embedding: bool = True,
+    hybrid: bool = False
+) -> CustomerMatchResponse:
+    """Run a matching strategy for one incoming customer and build the response
+    
+    The lookup, the stored results and the status update commit together.
+    At most settings.matching_max_concurrency runs hold a connection at once,
+    and each statement is bounded by settings.matching_statement_timeout_ms
+    (HNSW searches use settings.hnsw_ef_search).
+    Strategies that do not use the profile embedding pass needs_embedding=False
+    so it is not loaded. With settings.enable_parallel_hybrid, hybrid=True runs
+    the three strategies concurrently instead of calling find.
+    """
+    start_time = time.perf_counter()
     
     try:
-        # Get incoming customer
-        incoming_customer = db.query(IncomingCustomer).filter(
-            IncomingCustomer.request_id == request_id
-        ).first()
-        
-        if not incoming_customer:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Incoming customer with request_id {request_id} not found"
+        async with _matching_slots(), db.begin():
+            await _configure_matching_transaction(db)
+            
+            # Get incoming customer
+            columns = _INCOMING_WITH_PROFILE_EMBEDDING if needs_embedding else _INCOMING_WITHOUT_EMBEDDINGS
+            result = await db.execute(
+                select(IncomingCustomer)
+                .options(columns)
+                .where(IncomingCustomer.request_id == request_id)
             )
+            incoming_customer = result.scalars().first()
+            
+            if not incoming_customer:
+                raise HTTPException(
+                    status_code=404, 
+                    detail=f"Incoming customer with request_id {request_id} not found"
+                )
+            
+            if hybrid and settings.enable_parallel_hybrid:
+                matches = await _find_hybrid_parallel(incoming_customer, db)
+            else:
+                matches = await db.run_sync(
+                    lambda session: find(incoming_customer, session, commit=False)
+                )
+            
+            # Update processing status
+            incoming_customer.processing_status = "completed"
+            incoming_customer.processed_date = datetime.now()
         
-        # Process hybrid matching
-        matches = matching_service.find_matches_hybrid(incoming_customer, db)
-        
-        # Update processing status
-        incoming_customer.processing_status = "completed"
-        incoming_customer.processed_date = datetime.fromtimestamp(time.time())
-        db.commit()
-        
-        processing_time = (time.time() - start_time) * 1000
+        processing_time = (time.perf_counter() - start_time) * 1000  # Convert to milliseconds
         
-        return CustomerMatchResponse(
-            incoming_customer=incoming_customer,
+        return CustomerMatchResponse.model_construct(
+            incoming_customer=_incoming_customer_response(incoming_customer),
             matches=matches,
             total_matches=len(matches),
             processing_time_ms=processing_time
@@ -95,86 +156,117 @@ async def process_customer_matching_hybrid(request_id: int, db: Session = Depend
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing hybrid matching for request_id {request_id}: {e}")
+        logger.error(f"Error processing {label} for request_id {request_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/exact/{request_id}", response_model=CustomerMatchResponse)
-async def process_customer_matching_exact(request_id: int, db: Session = Depends(get_db)):
-    """Process matching for an incoming customer using exact matching only"""
-    start_time = time.time()
+@router.post("/bulk", response_model=List[CustomerMatchResponse])
+async def process_customer_matching_bulk(request_ids: List[int], db: AsyncSession = Depends(get_async_db)):
+    """Process hybrid matching for many incoming customers in one transaction
+    
+    Vector candidates for the whole batch come from a single query.
+    processing_time_ms reports the time for the whole batch.
+    """
+    start_time = time.perf_counter()
     
     try:
-        # Get incoming customer
-        incoming_customer = db.query(IncomingCustomer).filter(
-            IncomingCustomer.request_id == request_id
-        ).first()
-        
-        if not incoming_customer:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Incoming customer with request_id {request_id} not found"
+        async with _matching_slots(), db.begin():
+            await _configure_matching_transaction(db)
+            
+            # Get all incoming customers in one query
+            result = await db.execute(
+                select(IncomingCustomer)
+                .options(_INCOMING_WITH_PROFILE_EMBEDDING)
+                .where(IncomingCustomer.request_id.in_(request_ids))
             )
+            incoming_customers = {customer.request_id: customer for customer in result.scalars()}
+            
+            missing = [request_id for request_id in request_ids if request_id not in incoming_customers]
+            if missing:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Incoming customers with request_ids {missing} not found"
+                )
+            
+            matches_by_request = await db.run_sync(
+                lambda session: matching_service.find_matches_batch(
+                    list(incoming_customers.values()), session, commit=False
+                )
+            )
+            
+            # Update processing status
+            processed_date = datetime.now()
+            for incoming_customer in incoming_customers.values():
+                incoming_customer.processing_status = "completed"
+                incoming_customer.processed_date = processed_date
         
-        # Process exact matching
-        matches = matching_service.find_exact_matches(incoming_customer, db)
-        
-        # Update processing status
-        incoming_customer.processing_status = "completed"
-        incoming_customer.processed_date = datetime.fromtimestamp(time.time())
-        db.commit()
-        
-        processing_time = (time.time() - start_time) * 1000
+        processing_time = (time.perf_counter() - start_time) * 1000  # Convert to milliseconds
         
-        return CustomerMatchResponse(
-            incoming_customer=incoming_customer,
-            matches=matches,
-            total_matches=len(matches),
-            processing_time_ms=processing_time
-        )
+        return [
+            CustomerMatchResponse.model_construct(
+                incoming_customer=_incoming_customer_response(incoming_customers[request_id]),
+                matches=matches_by_request[request_id],
+                total_matches=len(matches_by_request[request_id]),
+                processing_time_ms=processing_time
+            )
+            for request_id in dict.fromkeys(request_ids)
+        ]
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing exact matching for request_id {request_id}: {e}")
+        logger.error(f"Error processing bulk matching for {len(request_ids)} requests: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/{request_id}", response_model=CustomerMatchResponse)
+async def process_customer_matching(request_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Process matching for an incoming customer using hybrid approach"""
+    return await _process_matching(request_id, db, matching_service.find_matches, "matching", hybrid=True)
+
+
+@router.post("/hybrid/{request_id}", response_model=CustomerMatchResponse)
+async def process_customer_matching_hybrid(request_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Process matching for an incoming customer using hybrid approach"""
+    return await _process_matching(
+        request_id, db, matching_service.find_matches_hybrid, "hybrid matching", hybrid=True
+    )
+
+
+@router.post("/exact/{request_id}", response_model=CustomerMatchResponse)
+async def process_customer_matching_exact(request_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Process matching for an incoming customer using exact matching only"""
+    return await _process_matching(
+        request_id, db, matching_service.find_exact_matches, "exact matching", needs_embedding=False
+    )
+
+
+def _matching_results_query(request_id: int) -> Select:
+    """Matching results for a request joined to their matched customers, best first"""
+    return (
+        select(MatchingResult, Customer)
+        .join(Customer, Customer.customer_id == MatchingResult.matched_customer_id)
+        .options(load_only(Customer.company_name, Customer.contact_name, Customer.email))
+        .where(MatchingResult.incoming_customer_id == request_id)
+        .order_by(desc(MatchingResult.similarity_score))
+    )
+
+
 @router.get("/results/{request_id}", response_model=List[MatchResult])
-async def get_matching_results(request_id: int, db: Session = Depends(get_db)):
+async def get_matching_results(request_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get matching results for an incoming customer"""
     try:
-        # Get matching results
-        results = db.query(MatchingResult).filter(
-            MatchingResult.incoming_customer_id == request_id
-        ).order_by(desc(MatchingResult.similarity_score)).all()
+        # Get matching results together with the matched customer in one query
+        rows = (await db.execute(_matching_results_query(request_id))).all()
         
-        if not results:
+        if not rows:
             raise HTTPException(
                 status_code=404,
                 detail=f"No matching results found for request_id {request_id}"
             )
         
         # Convert to response format
-        match_results = []
-        for result in results:
-            matched_customer = db.query(Customer).filter(
-                Customer.customer_id == result.matched_customer_id
-            ).first()
-            
-            if matched_customer:
-                match_results.append(MatchResult(
-                    match_id=result.match_id,
-                    matched_customer_id=result.matched_customer_id,
-                    matched_company_name=matched_customer.company_name,
-                    matched_contact_name=matched_customer.contact_name,
-                    matched_email=matched_customer.email,
-                    similarity_score=float(result.similarity_score or 0.0),
-                    match_type=result.match_type,
-                    confidence_level=float(result.confidence_level or 0.0),
-                    match_criteria=result.match_criteria or {},
-                    created_date=result.created_date
-                ))
+        match_results = [build_match_result(result, customer) for result, customer in rows]
         
         return match_results
         
@@ -182,4 +274,26 @@ async def get_matching_results(request_id: int, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         logger.error(f"Error getting matching results for request_id {request_id}: {e}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) 
+
+
+@router.get("/results/{request_id}/stream")
+async def stream_matching_results(request_id: int):
+    """Stream matching results for an incoming customer as JSON lines
+    
+    Rows are read from a server-side cursor and written as they arrive, so
+    memory stays flat and the first result is sent before the last is read.
+    An unknown request_id yields an empty body rather than a 404.
+    """
+    async def generate():
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(
+                _matching_results_query(request_id).execution_options(yield_per=STREAM_YIELD_PER)
+            )
+            async for partition in result.partitions():
+                yield b"".join(
+                    build_match_result(match, customer).model_dump_json().encode() + b"\n"
+                    for match, customer in partition
+                )
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -2,11 +2,11 @@
 import logging
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.schemas import TestResultResponse, TestResultList
-from app.services.test_result_processor import TestResultProcessor
+from app.services.test_result_processor import TestResultProcessor, get_test_result_processor
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -18,22 +18,21 @@ async def get_test_results(
     status: Optional[str] = Query(None, description="Filter by status"),
     limit: int = Query(50, ge=1, le=100, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    processor: TestResultProcessor = Depends(get_test_result_processor)
 ):
     """Get test results with optional filtering"""
     try:
-        processor = TestResultProcessor()
-        test_results = processor.get_test_results(
-            test_type=test_type,
-            status=status,
-            limit=limit,
-            offset=offset,
-            db=db
+        test_results, total_count = await db.run_sync(
+            lambda session: processor.get_test_results_with_count(
+                test_type=test_type,
+                status=status,
+                limit=limit,
+                offset=offset,
+                db=session
+            )
         )
         
-        # Get total count for pagination
-        total_count = len(test_results)  # This is simplified - in production you'd want a separate count query
-        
         return TestResultList(
             test_results=test_results,
             total_count=total_count,
@@ -47,11 +46,14 @@ async def get_test_results(
 
 
 @router.get("/{test_id}", response_model=TestResultResponse)
-async def get_test_result(test_id: int, db: Session = Depends(get_db)):
+async def get_test_result(
+    test_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    processor: TestResultProcessor = Depends(get_test_result_processor)
+):
     """Get a specific test result by ID"""
     try:
-        processor = TestResultProcessor()
-        test_result = processor.get_test_result(test_id, db)
+        test_result = await db.run_sync(lambda session: processor.get_test_result(test_id, session))
         
         if not test_result:
             raise HTTPException(
@@ -69,11 +71,13 @@ async def get_test_result(test_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/statistics/summary")
-async def get_test_statistics(db: Session = Depends(get_db)):
+async def get_test_statistics(
+    db: AsyncSession = Depends(get_async_db),
+    processor: TestResultProcessor = Depends(get_test_result_processor)
+):
     """Get aggregate statistics about test results"""
     try:
-        processor = TestResultProcessor()
-        statistics = processor.get_test_statistics(db)
+        statistics = await db.run_sync(processor.get_test_statistics)
         
         return {
             "statistics": statistics,
@@ -88,15 +92,17 @@ async def get_test_statistics(db: Session = Depends(get_db)):
 @router.get("/types/semantic-similarity", response_model=List[TestResultResponse])
 async def get_semantic_similarity_tests(
     limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    processor: TestResultProcessor = Depends(get_test_result_processor)
 ):
     """Get semantic similarity test results specifically"""
     try:
-        processor = TestResultProcessor()
-        test_results = processor.get_test_results(
-            test_type="semantic_similarity",
-            limit=limit,
-            db=db
+        test_results = await db.run_sync(
+            lambda session: processor.get_test_results(
+                test_type="semantic_similarity",
+                limit=limit,
+                db=session
+            )
         )
         
         return test_results
@@ -1,12 +1,17 @@
 """Core package for Customer Matching POC"""
 
-from .config import settings
-from .database import get_db, get_async_db, initialize_database, check_database_connection
+from .config import settings, get_settings
+from .database import (
+    get_db, get_async_db, initialize_database, check_database_connection,
+    check_database_connection_async
+)
 
 __all__ = [
     "settings",
+    "get_settings",
     "get_db", 
     "get_async_db", 
     "initialize_database", 
-    "check_database_connection"
+    "check_database_connection",
+    "check_database_connection_async"
 ] 
\ No newline at end of file
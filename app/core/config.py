@@ -1,8 +1,21 @@
 """Configuration settings for Customer Matching POC"""
+import asyncio
+import logging
 import os
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from pydantic import PrivateAttr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+logger = logging.getLogger(__name__)
+
+# Key Vault secret names provisioned by bicep/postgresql-pgvector.bicep
+KEY_VAULT_SECRETS = {
+    "postgresql-connection-string": "postgres_connection_string",
+    "openai-api-key": "azure_openai_api_key",
+    "openai-endpoint": "azure_openai_endpoint",
+}
+
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -24,11 +37,27 @@ class Settings(BaseSettings):
     postgres_user: str = "pgadmin"
     postgres_password: Optional[str] = None
     
+    # Connection pool settings
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_timeout: int = 30  # Seconds to wait for a free connection before failing
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = False  # pool_recycle retires stale connections without a ping per checkout
+    db_pool_use_lifo: bool = True  # Reuse the most recent connection so idle ones can time out
+    db_use_null_pool: bool = False  # Open a connection per checkout, e.g. serverless hosts behind PgBouncer
+    db_disable_jit: bool = True  # JIT compilation rarely pays off for short OLTP queries
+    db_behind_pgbouncer: bool = False  # Disables asyncpg statement cache for transaction pooling
+    db_query_cache_size: int = 1200  # Compiled SQL statements cached per engine
+    
     # Azure OpenAI Configuration
     azure_openai_endpoint: Optional[str] = None
     azure_openai_api_key: Optional[str] = None
     azure_openai_deployment_name: str = "text-embedding-ada-002"
     azure_openai_api_version: str = "2023-12-01-preview"
+    embedding_max_tokens: int = 8191  # Input limit of the embedding model
+    openai_max_retries: int = 3  # Retries with exponential backoff on 429/5xx
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 50
     
     # Azure Key Vault (Optional - for production)
     azure_key_vault_url: Optional[str] = None
@@ -48,10 +77,29 @@ class Settings(BaseSettings):
     # Fuzzy matching settings
     fuzzy_similarity_threshold: float = 0.8
     fuzzy_max_results: int = 10
+    fuzzy_name_index_ttl_seconds: float = 300.0  # Cached company names used for fuzzy scoring
     
     # Vector matching settings
     vector_similarity_threshold: float = 0.7  # Lowered from 0.7 to match actual embedding similarity scores
     vector_max_results: int = 5
+    hnsw_ef_search: int = 100  # HNSW candidate list per similarity query (pgvector default 40)
+    
+    # Two-stage (Matryoshka) search settings
+    search_prefilter_dimensions: int = 256  # Must match customers.full_profile_embedding_256
+    search_candidate_multiplier: int = 10   # Candidates re-ranked per requested result
+    
+    # Similarity search result cache
+    enable_search_cache: bool = True
+    search_cache_max_entries: int = 256
+    search_cache_similarity_threshold: float = 0.97  # Cosine similarity for an approximate hit
+    search_cache_ttl_seconds: float = 300.0
+    
+    # Vector matching candidate cache, keyed by the exact query embedding. The
+    # TTL bounds how long customers inserted outside this process (bulk
+    # imports, other workers) can be missing from cached candidates.
+    enable_match_cache: bool = True
+    match_cache_max_entries: int = 512
+    match_cache_ttl_seconds: float = 60.0
     
     # Hybrid matching settings
     enable_exact_matching: bool = True
@@ -60,6 +108,9 @@ class Settings(BaseSettings):
     exact_matching_priority: int = 1
     vector_matching_priority: int = 2
     fuzzy_matching_priority: int = 3
+    matching_max_concurrency: int = 8  # Matching runs holding a pooled connection at once
+    enable_parallel_hybrid: bool = False  # Run hybrid strategies concurrently, one connection each
+    matching_statement_timeout_ms: int = 30000
     
     # Business rules
     enable_business_rules: bool = True
@@ -71,14 +122,76 @@ class Settings(BaseSettings):
     # Performance settings
     batch_size: int = 16
     max_concurrent_requests: int = 10
-    cache_embeddings: bool = True
+    cache_embeddings: bool = True  # Reuse stored embeddings for identical texts
+    embedding_cache_max_entries: int = 5000  # In-process LRU, ~6 KB per 1536-dim embedding
+    openai_health_cache_seconds: float = 30.0
+    health_refresh_seconds: float = 15.0  # Background refresh of /health status
+    strict_email: bool = False  # Full email-validator parsing instead of a pattern check
     
     model_config = SettingsConfigDict(
         env_file="app/.env",
+        env_file_encoding="utf-8",
         case_sensitive=False,
         extra="ignore"  # Ignore extra fields from environment
     )
     
+    _secrets_loaded: bool = PrivateAttr(default=False)
+    
+    async def refresh_secrets(self) -> bool:
+        """Load secrets from Azure Key Vault, once per process
+        
+        Runs the blocking Key Vault SDK calls in worker threads and fetches all
+        secrets concurrently. Returns True if any setting was updated.
+        """
+        if self._secrets_loaded or not (self.use_key_vault and self.azure_key_vault_url):
+            return False
+        
+        from azure.identity import DefaultAzureCredential
+        from azure.keyvault.secrets import SecretClient
+        
+        client = SecretClient(vault_url=self.azure_key_vault_url, credential=DefaultAzureCredential())
+        names = list(KEY_VAULT_SECRETS)
+        values = await asyncio.gather(
+            *(asyncio.to_thread(client.get_secret, name) for name in names),
+            return_exceptions=True
+        )
+        
+        secrets: Dict[str, Any] = {}
+        for name, value in zip(names, values):
+            if isinstance(value, Exception):
+                logger.warning(f"Could not load Key Vault secret '{name}': {value}")
+                continue
+            secrets[KEY_VAULT_SECRETS[name]] = value.value
+        
+        connection_string = secrets.pop("postgres_connection_string", None)
+        if connection_string:
+            secrets.update(self._parse_connection_string(connection_string))
+        
+        for field, value in secrets.items():
+            setattr(self, field, value)
+        
+        self._secrets_loaded = True
+        logger.info(f"Loaded {len(secrets)} settings from Key Vault")
+        return bool(secrets)
+    
+    @staticmethod
+    def _parse_connection_string(connection_string: str) -> Dict[str, Any]:
+        """Map an ADO.NET style PostgreSQL connection string onto settings fields"""
+        keys = {
+            "host": "postgres_host",
+            "port": "postgres_port",
+            "database": "postgres_db",
+            "username": "postgres_user",
+            "password": "postgres_password",
+        }
+        values = {}
+        for part in connection_string.split(";"):
+            key, sep, value = part.partition("=")
+            field = keys.get(key.strip().lower())
+            if sep and field:
+                values[field] = int(value) if field == "postgres_port" else value.strip()
+        return values
+    
     def _build_db_url(self, async_mode: bool = False) -> str:
         host = self.postgres_host
         port = self.postgres_port
@@ -100,5 +213,15 @@ class Settings(BaseSettings):
         return self._build_db_url(async_mode=True)
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the cached settings instance
+    
+    The .env file is read and validated once per process. Routes take it via
+    Depends(get_settings) so tests can override it without reloading .env.
+    """
+    return Settings()
+
+
+# Global settings instance; the same object get_settings() returns
+settings = get_settings()
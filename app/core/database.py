@@ -1,41 +1,121 @@
 """Database connection and session management"""
 import logging
 from typing import Generator, AsyncGenerator
-from sqlalchemy import create_engine, text
+import orjson
+from pgvector.asyncpg import register_vector
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from .config import settings
 from app.models.database import Base
 
 logger = logging.getLogger(__name__)
 
-# Synchronous database engine
-engine = create_engine(
-    settings.database_url,
-    poolclass=StaticPool,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=settings.debug
-)
 
-# Asynchronous database engine
-async_engine = create_async_engine(
-    settings.async_database_url,
-    poolclass=StaticPool,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=settings.debug
-)
+def _json_serializer(value) -> str:
+    """orjson encoder for JSON columns; non-string keys are stringified like json.dumps does"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _pool_kwargs() -> dict:
+    """Engine and connection pool options shared by the sync and async engines
+    
+    Both engines use SQLAlchemy's default queue pools (QueuePool and
+    AsyncAdaptedQueuePool), sized from settings and checked out LIFO so a
+    small set of connections stays warm. With db_use_null_pool every checkout
+    opens a fresh connection, leaving pooling to PgBouncer. The compiled
+    statement cache is enlarged so repeated inserts and searches skip SQL
+    compilation, and JSON columns (e.g. match_criteria) go through orjson.
+    """
+    kwargs = {
+        "json_serializer": _json_serializer,
+        "json_deserializer": orjson.loads,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "query_cache_size": settings.db_query_cache_size,
+        "echo": settings.debug,
+    }
+    if settings.db_use_null_pool:
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_use_lifo=settings.db_pool_use_lifo,
+        )
+    return kwargs
+
+
+def _create_engine():
+    """Create the synchronous (psycopg2) engine"""
+    connect_args = {}
+    if settings.db_disable_jit:
+        connect_args["options"] = "-c jit=off"
+    return create_engine(settings.database_url, connect_args=connect_args, **_pool_kwargs())
+
+
+def _create_async_engine():
+    """Create the asynchronous (asyncpg) engine"""
+    connect_args = {}
+    if settings.db_disable_jit:
+        connect_args["server_settings"] = {"jit": "off"}
+    if settings.db_behind_pgbouncer:
+        # PgBouncer in transaction mode cannot keep prepared statements
+        connect_args["statement_cache_size"] = 0
+    new_engine = create_async_engine(settings.async_database_url, connect_args=connect_args, **_pool_kwargs())
+    
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def _register_vector_codec(dbapi_connection, connection_record):
+        # Binary vector/halfvec codecs: query embeddings travel as 2 bytes per
+        # dimension instead of text the server has to parse (see HalfVec)
+        dbapi_connection.run_async(register_vector)
+    
+    return new_engine
+
+
+def _create_engines():
+    """Create both engines, or (None, None) while database credentials are missing
+    
+    Key Vault deployments only have credentials after the lifespan has run
+    settings.refresh_secrets(); reconfigure_engines() then creates them.
+    """
+    try:
+        return _create_engine(), _create_async_engine()
+    except ValueError as e:
+        logger.info(f"Database engines not created yet: {e}")
+        return None, None
+
+
+# Synchronous and asynchronous database engines
+engine, async_engine = _create_engines()
 
-# Session makers
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Session makers; bound by reconfigure_engines() when the engines start as None
+SessionLocal = sessionmaker(bind=engine, autoflush=False)
 AsyncSessionLocal = async_sessionmaker(
     async_engine, class_=AsyncSession, expire_on_commit=False
 )
 
 
+async def reconfigure_engines():
+    """Create or rebuild engines from current settings, e.g. after Key Vault secrets load"""
+    global engine, async_engine
+    old_engine, old_async_engine = engine, async_engine
+    
+    engine = _create_engine()
+    async_engine = _create_async_engine()
+    SessionLocal.configure(bind=engine)
+    AsyncSessionLocal.configure(bind=async_engine)
+    
+    if old_engine is not None:
+        old_engine.dispose()
+    if old_async_engine is not None:
+        await old_async_engine.dispose()
+    logger.info("Database engines reconfigured")
+
+
 def get_db() -> Generator[Session, None, None]:
     """Get database session"""
     db = SessionLocal()
@@ -72,6 +152,17 @@ def check_database_connection() -> bool:
         return False
 
 
+async def check_database_connection_async() -> bool:
+    """Check if database connection is working, without blocking the event loop"""
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        logger.error(f"Database connection failed: {e}")
+        return False
+
+
 def check_pgvector_extension() -> bool:
     """Check if pgvector extension is installed"""
     try:
@@ -84,27 +175,25 @@ def check_pgvector_extension() -> bool:
 
 
 def initialize_database():
-    """Initialize database with required extensions and schema"""
+    """Initialize database with required extensions and schema
+
+    The extension check and schema creation share one connection and run as a
+    single transaction, so startup costs one checkout and one commit.
+    """
+    if engine is None:
+        logger.error("Database host and password are not configured")
+        return False
+    
     try:
-        # First check pgvector extension in autocommit mode
-        if not check_pgvector_extension():
-            logger.warning("pgvector extension not found. Please install it manually.")
-            return False
-            
-        # Then handle schema creation in a separate transaction
-        with engine.connect() as conn:
-            with conn.begin():
-                # Check if schema exists
-                schema_check = conn.execute(text("""
-                    SELECT schema_name 
-                    FROM information_schema.schemata 
-                    WHERE schema_name = 'customer_data'
-                """))
-                
-                if not schema_check.fetchone():
-                    logger.info("Creating customer_data schema...")
-                    conn.execute(text("CREATE SCHEMA IF NOT EXISTS customer_data"))
-        
+        with engine.begin() as conn:
+            extension = conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'vector'"))
+            if extension.scalar() is None:
+                logger.warning("pgvector extension not found. Please install it manually.")
+                return False
+
+            # IF NOT EXISTS makes a separate information_schema lookup unnecessary
+            conn.execute(text("CREATE SCHEMA IF NOT EXISTS customer_data"))
+
         logger.info("Database initialized successfully")
         return True
         
@@ -1,14 +1,17 @@
 """FastAPI application for Customer Matching POC"""
+import asyncio
+import hashlib
 import logging
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 
 from app.core.config import settings
-from app.core.database import initialize_database, check_database_connection
-from app.services.embedding_service import embedding_service
+from app.core.database import initialize_database, check_database_connection, reconfigure_engines
+from app.services.embedding_service import embedding_service, get_tokenizer
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.health import refresh_health_loop
 
 # Configure logging
 logging.basicConfig(
@@ -24,22 +27,38 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
     
+    # Load Key Vault secrets (no-op unless USE_KEY_VAULT is set)
+    if await settings.refresh_secrets():
+        await reconfigure_engines()
+        embedding_service.reload_client()
+    
     # Initialize database
     if not initialize_database():
         logger.error("Failed to initialize database")
         raise RuntimeError("Database initialization failed")
     
+    # Load the tokenizer (its encoding file may be downloaded) off the event loop
+    await asyncio.to_thread(get_tokenizer)
+    
     # Test embedding service
-    if not embedding_service.test_connection():
+    if not await embedding_service.test_connection_async():
         logger.error("Failed to connect to Azure OpenAI service")
         raise RuntimeError("Azure OpenAI connection failed")
     
+    # Keep /health answers current without probing on every request
+    health_task = asyncio.create_task(refresh_health_loop(settings.health_refresh_seconds))
+    
     logger.info("Application started successfully")
     
     yield
     
     # Shutdown
     logger.info("Application shutting down")
+    health_task.cancel()
+    # Let an in-flight probe finish unwinding before its client is closed
+    with suppress(asyncio.CancelledError):
+        await health_task
+    await embedding_service.aclose()
 
 
 # Create FastAPI app
@@ -49,6 +68,7 @@ app = FastAPI(
     description="Customer account matching using PostgreSQL with pgvector",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -62,10 +82,8 @@ app.add_middleware(
 )
 
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Root endpoint with simple web interface"""
-    html_content = """
+# Static landing page, encoded once; clients revalidate it with the ETag
+ROOT_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -126,8 +144,17 @@ async def root():
         </div>
     </body>
     </html>
-    """
-    return html_content
+""".encode("utf-8")
+ROOT_HTML_ETAG = f'"{hashlib.blake2b(ROOT_HTML, digest_size=8).hexdigest()}"'
+ROOT_HTML_HEADERS = {"ETag": ROOT_HTML_ETAG, "Cache-Control": "public, max-age=3600"}
+
+
+@app.get("/", response_class=HTMLResponse)
+async def root(request: Request):
+    """Root endpoint with simple web interface"""
+    if request.headers.get("if-none-match") == ROOT_HTML_ETAG:
+        return Response(status_code=304, headers=ROOT_HTML_HEADERS)
+    return HTMLResponse(content=ROOT_HTML, headers=ROOT_HTML_HEADERS)
 
 
 # Include API routes
@@ -7,6 +7,7 @@ from .database import (
 from .schemas import (
     CustomerBase, CustomerCreate, CustomerResponse,
     IncomingCustomerCreate, IncomingCustomerResponse,
+    CustomerCreateList, IncomingCustomerCreateList, CustomerResponseList, IncomingCustomerResponseList,
     MatchResult, CustomerMatchResponse,
     SimilaritySearchRequest, SimilaritySearchResult,
     HealthCheck, TestResultBase, TestResultCreate, TestResultResponse, TestResultList
@@ -18,6 +19,7 @@ __all__ = [
     # Pydantic schemas
     "CustomerBase", "CustomerCreate", "CustomerResponse",
     "IncomingCustomerCreate", "IncomingCustomerResponse", 
+    "CustomerCreateList", "IncomingCustomerCreateList", "CustomerResponseList", "IncomingCustomerResponseList",
     "MatchResult", "CustomerMatchResponse",
     "SimilaritySearchRequest", "SimilaritySearchResult", "HealthCheck",
     "TestResultBase", "TestResultCreate", "TestResultResponse", "TestResultList"
@@ -1,25 +1,119 @@
 """SQLAlchemy models for Customer Matching POC"""
 from datetime import datetime
 from typing import Optional, List, Any
-from decimal import Decimal
-from sqlalchemy import Column, Integer, String, Text, DECIMAL, DateTime, Boolean, ForeignKey, JSON
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import BigInteger, Column, Computed, Index, Integer, REAL, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship, declarative_base, Mapped, mapped_column
-from sqlalchemy.sql import func
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.sql import func, text
+from sqlalchemy.types import TypeDecorator
+import numpy as np
+from pgvector import HalfVector
+from pgvector.sqlalchemy import HALFVEC
 
 Base = declarative_base()
 
 
+def halfvec_literal(values) -> str:
+    """pgvector text literal for a halfvec column
+    
+    Values are rounded to float16 first and written with 5 significant
+    digits, which is enough to round-trip every float16 exactly. The literal
+    is less than half the size of one built from float64 reprs.
+    """
+    if isinstance(values, HalfVector):
+        values = values.to_numpy()
+    halves = np.asarray(values, dtype=np.float16).tolist()
+    return "[" + ",".join([f"{value:.5g}" for value in halves]) + "]"
+
+
+class HalfVec(HALFVEC):
+    """HALFVEC column type with compact binds
+    
+    On asyncpg, values are bound as HalfVector and sent in pgvector's binary
+    format through the codec registered on each connection (see
+    app.core.database). Other drivers get compact halfvec_literal text.
+    """
+    cache_ok = True
+    
+    def bind_processor(self, dialect):
+        if dialect.driver == "asyncpg":
+            def process_binary(value):
+                if value is None or isinstance(value, HalfVector):
+                    return value
+                return HalfVector(np.asarray(value, dtype=np.float32))
+            return process_binary
+        
+        def process(value):
+            if value is None or isinstance(value, str):
+                return value
+            return halfvec_literal(value)
+        return process
+
+
+def to_cents(amount) -> Optional[int]:
+    """Whole cents for a currency amount, rounding half up"""
+    if amount is None:
+        return None
+    return int((Decimal(str(amount)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+class Cents(TypeDecorator):
+    """Currency amount stored as BIGINT cents, exposed as a Decimal with two places
+    
+    Comparisons and aggregates run on 8-byte integers instead of numeric,
+    while Python code keeps seeing the dollar Decimal a DECIMAL(15, 2) column
+    returned. Raw SQL reads get cents.
+    """
+    impl = BigInteger
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        return to_cents(value)
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return Decimal(value).scaleb(-2)
+
+
+def _hnsw_index(name: str, column: str, m: int = 16, ef_construction: int = 64) -> Index:
+    """HNSW cosine-distance index on a halfvec column, as created by the sql/ scripts"""
+    return Index(
+        name, column,
+        postgresql_using="hnsw",
+        postgresql_with={"m": m, "ef_construction": ef_construction},
+        postgresql_ops={column: "halfvec_cosine_ops"}
+    )
+
+
 class Customer(Base):
     """Customer table model"""
     __tablename__ = "customers"
-    __table_args__ = {"schema": "customer_data"}
+    __table_args__ = (
+        # Searched with ORDER BY <=> LIMIT k; tuned for 100k+ customers (sql/11)
+        _hnsw_index("idx_customers_company_embedding", "company_name_embedding", m=24, ef_construction=128),
+        _hnsw_index("idx_customers_profile_embedding", "full_profile_embedding", m=24, ef_construction=128),
+        _hnsw_index("idx_customers_profile_embedding_256", "full_profile_embedding_256", m=24, ef_construction=128),
+        # Index-only lookups of the columns match results show (sql/16)
+        Index(
+            "idx_customers_match_display", "customer_id",
+            postgresql_include=["company_name", "contact_name", "email"]
+        ),
+        # Exact matching on lower(email) and normalised phone digits (sql/09, sql/10)
+        Index("idx_customers_email_lower", func.lower(text("email"))),
+        Index("idx_customers_phone_digits", "phone_digits"),
+        {"schema": "customer_data"},
+    )
     
     customer_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     company_name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
     contact_name: Mapped[Optional[str]] = mapped_column(String(255))
     email: Mapped[Optional[str]] = mapped_column(String(255), index=True)
     phone: Mapped[Optional[str]] = mapped_column(String(50), index=True)
+    phone_digits: Mapped[Optional[str]] = mapped_column(
+        Text, Computed("regexp_replace(phone, '\\D', '', 'g')", persisted=True)
+    )
     address_line1: Mapped[Optional[str]] = mapped_column(String(255))
     address_line2: Mapped[Optional[str]] = mapped_column(String(255))
     city: Mapped[Optional[str]] = mapped_column(String(100))
@@ -27,29 +121,43 @@ class Customer(Base):
     postal_code: Mapped[Optional[str]] = mapped_column(String(20))
     country: Mapped[Optional[str]] = mapped_column(String(100))
     industry: Mapped[Optional[str]] = mapped_column(String(100))
-    annual_revenue: Mapped[Optional[Decimal]] = mapped_column(DECIMAL(15, 2))
+    annual_revenue: Mapped[Optional[Decimal]] = mapped_column(Cents)
     employee_count: Mapped[Optional[int]] = mapped_column(Integer)
     website: Mapped[Optional[str]] = mapped_column(String(255))
     description: Mapped[Optional[str]] = mapped_column(Text)
-    created_date: Mapped[datetime] = mapped_column(DateTime, default=func.now())
-    updated_date: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    created_date: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_date: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
     
     # Vector embeddings
-    company_name_embedding: Mapped[Optional[Any]] = mapped_column(Vector(1536))
-    full_profile_embedding: Mapped[Optional[Any]] = mapped_column(Vector(1536))
+    company_name_embedding: Mapped[Optional[Any]] = mapped_column(HalfVec(1536))
+    full_profile_embedding: Mapped[Optional[Any]] = mapped_column(HalfVec(1536))
+    full_profile_embedding_256: Mapped[Optional[Any]] = mapped_column(
+        HalfVec(256),
+        Computed("l2_normalize(subvector(full_profile_embedding, 1, 256))", persisted=True)
+    )
     
-    # Relationships
+    # Relationships; eager load when needed (see MatchingResult)
     matches: Mapped[List["MatchingResult"]] = relationship(
         "MatchingResult", 
         foreign_keys="MatchingResult.matched_customer_id", 
-        back_populates="matched_customer"
+        back_populates="matched_customer",
+        lazy="raise_on_sql"
     )
 
 
 class IncomingCustomer(Base):
     """Incoming customer requests table model"""
     __tablename__ = "incoming_customers"
-    __table_args__ = {"schema": "customer_data"}
+    __table_args__ = (
+        _hnsw_index("idx_incoming_company_embedding", "company_name_embedding"),
+        _hnsw_index("idx_incoming_profile_embedding", "full_profile_embedding"),
+        # Only the pending queue, oldest first (sql/15)
+        Index(
+            "idx_incoming_customers_pending", "request_date",
+            postgresql_where=text("processing_status = 'pending'")
+        ),
+        {"schema": "customer_data"},
+    )
     
     request_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     company_name = Column(String(255), nullable=False)
@@ -63,22 +171,27 @@ class IncomingCustomer(Base):
     postal_code = Column(String(20))
     country = Column(String(100))
     industry = Column(String(100))
-    annual_revenue = Column(DECIMAL(15, 2))
+    annual_revenue = Column(Cents)
     employee_count = Column(Integer)
     website = Column(String(255))
     description = Column(Text)
-    request_date: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    request_date: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     
     # Vector embeddings
-    company_name_embedding = Column(Vector(1536))
-    full_profile_embedding = Column(Vector(1536))
+    company_name_embedding = Column(HalfVec(1536))
+    full_profile_embedding = Column(HalfVec(1536))
     
     # Processing status
     processing_status: Mapped[str] = mapped_column(String(20), default="pending")
     processed_date: Mapped[Optional[datetime]] = mapped_column(DateTime)
     
-    # Relationships
-    matches = relationship("MatchingResult", foreign_keys="MatchingResult.incoming_customer_id", back_populates="incoming_customer")
+    # Relationships; eager load when needed (see MatchingResult)
+    matches: Mapped[List["MatchingResult"]] = relationship(
+        "MatchingResult",
+        foreign_keys="MatchingResult.incoming_customer_id",
+        back_populates="incoming_customer",
+        lazy="raise_on_sql"
+    )
 
 
 class MatchingResult(Base):
@@ -89,36 +202,57 @@ class MatchingResult(Base):
     match_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     incoming_customer_id: Mapped[int] = mapped_column(Integer, ForeignKey("customer_data.incoming_customers.request_id"))
     matched_customer_id: Mapped[int] = mapped_column(Integer, ForeignKey("customer_data.customers.customer_id"))
-    similarity_score: Mapped[Optional[Decimal]] = mapped_column(DECIMAL(5, 4))
+    similarity_score: Mapped[Optional[float]] = mapped_column(REAL)
     match_type: Mapped[str] = mapped_column(String(50))  # 'exact', 'high_confidence', 'potential', 'low_confidence'
-    match_criteria: Mapped[Optional[dict]] = mapped_column(JSON)
-    confidence_level: Mapped[Optional[Decimal]] = mapped_column(DECIMAL(5, 4))
-    created_date: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    match_criteria: Mapped[Optional[dict]] = mapped_column(JSONB)
+    confidence_level: Mapped[Optional[float]] = mapped_column(REAL)
+    created_date: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     reviewed: Mapped[bool] = mapped_column(Boolean, default=False)
     reviewer_notes: Mapped[Optional[str]] = mapped_column(Text)
     
-    # Relationships
-    incoming_customer = relationship("IncomingCustomer", foreign_keys=[incoming_customer_id], back_populates="matches")
-    matched_customer = relationship("Customer", foreign_keys=[matched_customer_id], back_populates="matches")
+    # Relationships; readers must eager load them, so a per-row lazy load
+    # (N+1 queries) raises instead of silently hitting the database
+    incoming_customer = relationship(
+        "IncomingCustomer", foreign_keys=[incoming_customer_id], back_populates="matches", lazy="raise_on_sql"
+    )
+    matched_customer = relationship(
+        "Customer", foreign_keys=[matched_customer_id], back_populates="matches", lazy="raise_on_sql"
+    )
+
+
+class EmbeddingCache(Base):
+    """Cached embeddings keyed by model and text hash"""
+    __tablename__ = "embedding_cache"
+    __table_args__ = {"schema": "customer_data"}
+    
+    model_name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    text_hash: Mapped[str] = mapped_column(String(64), primary_key=True)  # SHA-256 of the canonical text
+    embedding: Mapped[Any] = mapped_column(HalfVec(1536), nullable=False)
+    created_date: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
 
 class TestResult(Base):
     """Test execution results table model"""
     __tablename__ = "test_results"
-    __table_args__ = {"schema": "customer_data"}
+    __table_args__ = (
+        # Containment (@>) lookups for dashboards slicing runs by parameters and metrics
+        Index("idx_test_results_configuration_gin", "test_configuration", postgresql_using="gin"),
+        Index("idx_test_results_execution_metrics_gin", "execution_metrics", postgresql_using="gin"),
+        {"schema": "customer_data"},
+    )
     
     test_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     test_name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
     test_type: Mapped[str] = mapped_column(String(100), nullable=False)  # 'semantic_similarity', 'performance', 'integration', etc.
-    test_configuration: Mapped[Optional[dict]] = mapped_column(JSON)  # Store test parameters and settings
-    test_data_summary: Mapped[Optional[dict]] = mapped_column(JSON)  # Summary of test data used
-    execution_metrics: Mapped[Optional[dict]] = mapped_column(JSON)  # Performance metrics, timing, etc.
-    results_summary: Mapped[Optional[dict]] = mapped_column(JSON)  # Aggregate test results
-    analysis_results: Mapped[Optional[dict]] = mapped_column(JSON)  # Detailed analysis and insights
-    recommendations: Mapped[Optional[dict]] = mapped_column(JSON)  # Recommendations from analysis
+    test_configuration: Mapped[Optional[dict]] = mapped_column(JSONB)  # Store test parameters and settings
+    test_data_summary: Mapped[Optional[dict]] = mapped_column(JSONB)  # Summary of test data used
+    execution_metrics: Mapped[Optional[dict]] = mapped_column(JSONB)  # Performance metrics, timing, etc.
+    results_summary: Mapped[Optional[dict]] = mapped_column(JSONB)  # Aggregate test results
+    analysis_results: Mapped[Optional[dict]] = mapped_column(JSONB)  # Detailed analysis and insights
+    recommendations: Mapped[Optional[dict]] = mapped_column(JSONB)  # Recommendations from analysis
     status: Mapped[str] = mapped_column(String(50), default="completed")  # 'running', 'completed', 'failed'
     error_message: Mapped[Optional[str]] = mapped_column(Text)  # Error details if test failed
-    created_date: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    created_date: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     completed_date: Mapped[Optional[datetime]] = mapped_column(DateTime)
     created_by: Mapped[Optional[str]] = mapped_column(String(100))  # User or system that ran the test
     notes: Mapped[Optional[str]] = mapped_column(Text)  # Additional notes about the test run
@@ -0,0 +1,47 @@
+"""Size-adaptive HNSW parameters for the customer embedding indexes"""
+from typing import Dict, List
+
+# (exclusive upper bound on vector count, m, ef_construction, ef_search).
+# Small datasets build quickly with the pgvector defaults; larger ones need a
+# denser graph and a wider search list to keep recall.
+HNSW_SIZE_BANDS = [
+    (100_000, 16, 64, 40),
+    (1_000_000, 24, 128, 100),
+    (None, 32, 200, 200),
+]
+
+# Customer indexes rebuilt with size-adaptive parameters (see Customer.__table_args__)
+CUSTOMER_HNSW_INDEXES = {
+    "idx_customers_company_embedding": "company_name_embedding",
+    "idx_customers_profile_embedding": "full_profile_embedding",
+    "idx_customers_profile_embedding_256": "full_profile_embedding_256",
+}
+
+
+def configure_hnsw_params(vector_count: int) -> Dict[str, int]:
+    """HNSW build and search parameters for an index over vector_count vectors"""
+    for upper_bound, m, ef_construction, ef_search in HNSW_SIZE_BANDS:
+        if upper_bound is None or vector_count < upper_bound:
+            return {"m": m, "ef_construction": ef_construction, "ef_search": ef_search}
+
+
+def customer_hnsw_index_ddl(params: Dict[str, int]) -> List[str]:
+    """Statements rebuilding the customer HNSW indexes with params, without blocking reads
+    
+    Each index is built CONCURRENTLY under a temporary name, then swapped in
+    for the old one, so searches keep using the old index until the new one
+    is ready. The statements must run outside a transaction block. A leftover
+    temporary index from an interrupted run is dropped first.
+    """
+    statements = []
+    for index_name, column in CUSTOMER_HNSW_INDEXES.items():
+        new_name = f"{index_name}_new"
+        statements.append(f"DROP INDEX CONCURRENTLY IF EXISTS customer_data.{new_name}")
+        statements.append(
+            f"CREATE INDEX CONCURRENTLY {new_name} ON customer_data.customers "
+            f"USING hnsw ({column} halfvec_cosine_ops) "
+            f"WITH (m = {int(params['m'])}, ef_construction = {int(params['ef_construction'])})"
+        )
+        statements.append(f"DROP INDEX CONCURRENTLY IF EXISTS customer_data.{index_name}")
+        statements.append(f"ALTER INDEX customer_data.{new_name} RENAME TO {index_name}")
+    return statements
@@ -1,10 +1,12 @@
 """Pydantic schemas for Customer Matching POC API"""
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, ConfigDict, EmailStr, field_validator
+from typing import Annotated, Optional, List, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, StringConstraints, TypeAdapter, field_validator
 from enum import Enum
 
+from app.core.config import settings
+
 
 class ConfidenceLevel(str, Enum):
     """Confidence level categories"""
@@ -29,11 +31,21 @@ class ProcessingStatus(str, Enum):
     FAILED = "failed"
 
 
+# Syntactic email check run by pydantic-core's regex engine. Full RFC 5321
+# parsing with email-validator (EmailStr) costs far more per row and is
+# opt-in through settings.strict_email.
+EmailStrFast = Annotated[str, StringConstraints(pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$", max_length=255)]
+CustomerEmail = EmailStr if settings.strict_email else EmailStrFast
+
+
 class CustomerBase(BaseModel):
     """Base customer model for API"""
-    company_name: str = Field(..., min_length=1, description="Company name (cannot be empty)")
+    # Stripped and length-checked by pydantic-core, no Python validator call
+    company_name: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)] = Field(
+        ..., description="Company name (cannot be empty)"
+    )
     contact_name: Optional[str] = Field(None, description="Primary contact name")
-    email: Optional[EmailStr] = Field(None, description="Email address")
+    email: Optional[CustomerEmail] = Field(None, description="Email address")
     phone: Optional[str] = Field(None, description="Phone number")
     address_line1: Optional[str] = Field(None, description="Address line 1")
     address_line2: Optional[str] = Field(None, description="Address line 2")
@@ -47,27 +59,6 @@ class CustomerBase(BaseModel):
     website: Optional[str] = Field(None, description="Website URL")
     description: Optional[str] = Field(None, description="Company description")
 
-    @field_validator('company_name')
-    @classmethod
-    def validate_company_name(cls, v):
-        if not v or not v.strip():
-            raise ValueError('Company name cannot be empty')
-        return v.strip()
-
-    @field_validator('annual_revenue')
-    @classmethod
-    def validate_annual_revenue(cls, v):
-        if v is not None and v < 0:
-            raise ValueError('Annual revenue cannot be negative')
-        return v
-
-    @field_validator('employee_count')
-    @classmethod
-    def validate_employee_count(cls, v):
-        if v is not None and v < 0:
-            raise ValueError('Employee count cannot be negative')
-        return v
-
 
 class CustomerCreate(CustomerBase):
     """Customer creation model"""
@@ -98,6 +89,13 @@ class IncomingCustomerResponse(CustomerBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Validate or serialise whole customer lists in one pydantic-core call
+CustomerCreateList = TypeAdapter(List[CustomerCreate])
+IncomingCustomerCreateList = TypeAdapter(List[IncomingCustomerCreate])
+CustomerResponseList = TypeAdapter(List[CustomerResponse])
+IncomingCustomerResponseList = TypeAdapter(List[IncomingCustomerResponse])
+
+
 class MatchResult(BaseModel):
     """Match result model"""
     match_id: int
@@ -199,6 +197,9 @@ class PaginationParams(BaseModel):
     """Pagination parameters for API requests"""
     page: int = Field(1, ge=1, description="Page number (starting from 1)")
     page_size: int = Field(25, ge=1, le=100, description="Number of items per page (1-100)")
+    sort_by: str = Field("confidence_level", description="Field to sort by")
+    sort_order: str = Field("desc", pattern="^(asc|desc)$", description="Sort order (asc, desc)")
+    cursor: Optional[str] = Field(None, description="Keyset cursor from a previous page; overrides page")
     
     @field_validator('page')
     @classmethod
@@ -344,6 +345,7 @@ class BulkMatchDisplay(BaseModel):
     total_count: int = Field(ge=0, description="Total number of matches available")
     filters_applied: Optional[MatchFilters] = None
     summary_stats: Optional[Dict[str, Any]] = None
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -1,10 +1,11 @@
 """Display service for matching results presentation"""
+import base64
 import logging
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
-from decimal import Decimal
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, asc, func, and_, or_
+import orjson
+from sqlalchemy.orm import Session, aliased, joinedload, load_only
+from sqlalchemy import desc, asc, func, and_, or_, tuple_
 
 from app.models.database import Customer, IncomingCustomer, MatchingResult
 from app.models.schemas import (
@@ -17,6 +18,13 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Sortable bulk-display fields; company_name sorts on the matched customer
+BULK_SORT_FIELDS = ("confidence_level", "similarity_score", "created_date", "company_name")
+
+# Columns the display responses read; the customers' embeddings are never loaded
+_CUSTOMER_DISPLAY_COLUMNS = [getattr(Customer, name) for name in CustomerResponse.model_fields]
+_INCOMING_DISPLAY_COLUMNS = [getattr(IncomingCustomer, name) for name in IncomingCustomerResponse.model_fields]
+
 
 class MatchDisplayService:
     """Service for displaying matching results in various formats"""
@@ -28,24 +36,20 @@ class MatchDisplayService:
         self.low_confidence_threshold = 0.5
     
     def _safe_decimal_to_float(self, value: Any) -> float:
-        """Safely convert SQLAlchemy Decimal to float"""
+        """Safely convert a nullable numeric column value to float"""
         if value is None:
             return 0.0
         return float(value)
     
-    def _safe_dict_from_json(self, value: Any) -> Dict[str, Any]:
-        """Safely convert SQLAlchemy JSON to dict"""
-        if value is None:
-            return {}
-        return dict(value) if isinstance(value, dict) else {}
-        
     def get_detailed_match_view(self, request_id: int, db: Session) -> DetailedMatchDisplay:
         """Get comprehensive match display for a specific incoming customer"""
         try:
             logger.info(f"Getting detailed match view for request_id: {request_id}")
             
             # Get incoming customer
-            incoming_customer = db.query(IncomingCustomer).filter(
+            incoming_customer = db.query(IncomingCustomer).options(
+                load_only(*_INCOMING_DISPLAY_COLUMNS)
+            ).filter(
                 IncomingCustomer.request_id == request_id
             ).first()
             
@@ -55,7 +59,7 @@ class MatchDisplayService:
             
             # Get matches with eager loading of relationships
             matches = db.query(MatchingResult).options(
-                joinedload(MatchingResult.matched_customer)
+                joinedload(MatchingResult.matched_customer).load_only(*_CUSTOMER_DISPLAY_COLUMNS)
             ).filter(
                 MatchingResult.incoming_customer_id == request_id
             ).order_by(desc(MatchingResult.confidence_level)).all()
@@ -78,20 +82,7 @@ class MatchDisplayService:
                     
                     match_details.append(MatchedCustomerDetail(
                         customer_info=CustomerResponse.model_validate(matched_customer),
-                        match_details=MatchResult(
-                            match_id=match.match_id,
-                            matched_customer_id=match.matched_customer_id,
-                            matched_company_name=matched_customer.company_name,
-                            matched_contact_name=matched_customer.contact_name,
-                            matched_email=matched_customer.email,
-                            similarity_score=self._safe_decimal_to_float(match.similarity_score),
-                            match_type=match.match_type,
-                            confidence_level=confidence_level,
-                            match_criteria=self._safe_dict_from_json(match.match_criteria),
-                            created_date=match.created_date,
-                            reviewed=match.reviewed,
-                            reviewer_notes=match.reviewer_notes
-                        ),
+                        match_details=build_match_result(match, matched_customer),
                         comparison_highlights=comparison_highlights,
                         confidence_breakdown=confidence_breakdown,
                         confidence_category=confidence_category
@@ -119,8 +110,8 @@ class MatchDisplayService:
             
             # Build base query with eager loading
             query = db.query(MatchingResult).options(
-                joinedload(MatchingResult.incoming_customer),
-                joinedload(MatchingResult.matched_customer)
+                joinedload(MatchingResult.incoming_customer).load_only(*_INCOMING_DISPLAY_COLUMNS),
+                joinedload(MatchingResult.matched_customer).load_only(*_CUSTOMER_DISPLAY_COLUMNS)
             )
             
             # Apply filters
@@ -130,9 +121,23 @@ class MatchDisplayService:
             # Get total count before pagination
             total_count = query.count()
             
-            # Apply pagination and ordering
-            offset = (pagination.page - 1) * pagination.page_size
-            matches = query.order_by(desc(MatchingResult.confidence_level)).offset(offset).limit(pagination.page_size).all()
+            # Sort and paginate in SQL. With a cursor the page is located by
+            # keyset (sort value, match_id), so every page costs the same as
+            # the first; without one, page/page_size map to OFFSET/LIMIT.
+            page_query, sort_column = self._apply_sort(query, pagination)
+            if pagination.cursor:
+                cursor_value, cursor_id = self._decode_cursor(pagination.cursor, pagination.sort_by)
+                keyset = tuple_(sort_column, MatchingResult.match_id)
+                bound = tuple_(cursor_value, cursor_id)
+                page_query = page_query.filter(keyset < bound if pagination.sort_order == "desc" else keyset > bound)
+            else:
+                page_query = page_query.offset((pagination.page - 1) * pagination.page_size)
+            
+            matches = page_query.limit(pagination.page_size).all()
+            
+            next_cursor = None
+            if len(matches) == pagination.page_size:
+                next_cursor = self._encode_cursor(matches[-1], pagination.sort_by)
             
             # Build detailed match list
             match_details = []
@@ -147,20 +152,7 @@ class MatchDisplayService:
                 
                 match_details.append(MatchedCustomerDetail(
                     customer_info=CustomerResponse.model_validate(matched_customer),
-                    match_details=MatchResult(
-                        match_id=match.match_id,
-                        matched_customer_id=match.matched_customer_id,
-                        matched_company_name=matched_customer.company_name,
-                        matched_contact_name=matched_customer.contact_name,
-                        matched_email=matched_customer.email,
-                        similarity_score=self._safe_decimal_to_float(match.similarity_score),
-                        match_type=match.match_type,
-                        confidence_level=confidence_level,
-                        match_criteria=self._safe_dict_from_json(match.match_criteria),
-                        created_date=match.created_date,
-                        reviewed=match.reviewed,
-                        reviewer_notes=match.reviewer_notes
-                    ),
+                    match_details=build_match_result(match, matched_customer),
                     comparison_highlights=comparison_highlights,
                     confidence_breakdown=confidence_breakdown,
                     confidence_category=confidence_category
@@ -174,7 +166,8 @@ class MatchDisplayService:
                 pagination=pagination,
                 total_count=total_count,
                 filters_applied=filters,
-                summary_stats=summary_stats
+                summary_stats=summary_stats,
+                next_cursor=next_cursor
             )
             
         except Exception as e:
@@ -343,6 +336,45 @@ class MatchDisplayService:
         
         return query
     
+    def _apply_sort(self, query, pagination: PaginationParams):
+        """Order the query by the requested field with match_id as tiebreaker"""
+        if pagination.sort_by not in BULK_SORT_FIELDS:
+            raise ValueError(f"Invalid sort field: {pagination.sort_by}")
+        
+        if pagination.sort_by == "company_name":
+            # Aliased so it cannot collide with joins added by the filters
+            sort_customer = aliased(Customer)
+            query = query.join(sort_customer, MatchingResult.matched_customer_id == sort_customer.customer_id)
+            sort_column = sort_customer.company_name
+        else:
+            sort_column = getattr(MatchingResult, pagination.sort_by)
+        
+        direction = desc if pagination.sort_order == "desc" else asc
+        return query.order_by(direction(sort_column), direction(MatchingResult.match_id)), sort_column
+    
+    def _encode_cursor(self, match: MatchingResult, sort_by: str) -> str:
+        """Encode the keyset position of the last row on a page"""
+        if sort_by == "company_name":
+            value = match.matched_customer.company_name
+        else:
+            value = getattr(match, sort_by)
+        # orjson writes datetimes as ISO 8601 itself and returns bytes directly
+        payload = orjson.dumps([value, match.match_id])
+        return base64.urlsafe_b64encode(payload).decode("ascii")
+    
+    def _decode_cursor(self, cursor: str, sort_by: str) -> Tuple[Any, int]:
+        """Decode a cursor produced by _encode_cursor"""
+        try:
+            value, match_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        if sort_by == "created_date":
+            value = datetime.fromisoformat(value)
+        elif sort_by in ("confidence_level", "similarity_score"):
+            # REAL columns load as the exact double of their float32 value
+            value = float(value)
+        return value, int(match_id)
+    
     def _get_confidence_category(self, confidence_level: float) -> ConfidenceLevel:
         """Get confidence category based on threshold"""
         if confidence_level >= self.high_confidence_threshold:
@@ -389,6 +421,28 @@ def generate_comparison_highlights(incoming_customer: IncomingCustomer, matched_
     return service.get_comparison_highlights(incoming_customer, matched_customer)
 
 
+def build_match_result(match: MatchingResult, matched_customer: Customer) -> MatchResult:
+    """Build the MatchResult for a stored match and its matched customer
+    
+    Both come from trusted database rows, so the model is constructed without
+    validation.
+    """
+    return MatchResult.model_construct(
+        match_id=match.match_id,
+        matched_customer_id=match.matched_customer_id,
+        matched_company_name=matched_customer.company_name,
+        matched_contact_name=matched_customer.contact_name,
+        matched_email=matched_customer.email,
+        similarity_score=float(match.similarity_score or 0.0),
+        match_type=match.match_type,
+        confidence_level=float(match.confidence_level or 0.0),
+        match_criteria=dict(match.match_criteria) if isinstance(match.match_criteria, dict) else {},
+        created_date=match.created_date,
+        reviewed=match.reviewed,
+        reviewer_notes=match.reviewer_notes
+    )
+
+
 def calculate_confidence_breakdown(match: MatchingResult) -> ConfidenceBreakdown:
     """Calculate detailed confidence factors for a match"""
     try:
@@ -577,4 +631,9 @@ def generate_field_comparison(incoming_value: Optional[str], matched_value: Opti
 
 
 # Global service instance
-display_service = MatchDisplayService() 
\ No newline at end of file
+display_service = MatchDisplayService() 
+
+
+def get_display_service() -> MatchDisplayService:
+    """Get the global display service instance"""
+    return display_service
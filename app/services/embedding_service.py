@@ -1,15 +1,122 @@
 """Azure OpenAI embedding service for Customer Matching POC"""
+import asyncio
+import hashlib
+import importlib.util
 import logging
+import threading
 import time
-from typing import List, Tuple, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional, Union
 import numpy as np
-import openai
-from openai import AzureOpenAI
+from sqlalchemy import Select, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.models.database import EmbeddingCache
+
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Line breaks and tabs become spaces in a single pass over embedding input
+WHITESPACE_TABLE = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    """cl100k_base tokenizer used by the OpenAI embedding models
+    
+    Returns None when tiktoken or its encoding file (downloaded on first use)
+    is unavailable, e.g. on hosts without outbound internet access.
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, truncating embedding input by characters: {e}")
+        return None
+
+
+@lru_cache(maxsize=1)
+def _request_slots() -> asyncio.Semaphore:
+    """Semaphore capping in-flight embedding requests across the whole process
+    
+    Shared by every concurrent batch call (bulk endpoints, the importer), so
+    settings.max_concurrent_requests bounds the total load on Azure OpenAI.
+    Created on first use, inside the running event loop: on Python 3.9 a
+    semaphore created at import binds to a different loop.
+    """
+    return asyncio.Semaphore(settings.max_concurrent_requests)
+
+
+class LocalEmbeddingCache:
+    """Thread-safe in-process LRU of embeddings keyed by deployment and text hash"""
+    
+    def __init__(self, max_entries: int = 5000):
+        """Initialize an empty cache"""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _key(text: str) -> str:
+        """BLAKE2b of the whitespace-normalised text, scoped to the deployment"""
+        canonical = " ".join(text.split())
+        digest = hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{settings.azure_openai_deployment_name}|{digest}"
+    
+    def get(self, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for a text, if any"""
+        key = self._key(text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return embedding.tolist()
+    
+    def put(self, text: str, embedding: List[float]):
+        """Store an embedding as float32, evicting the least recently used entry if full"""
+        key = self._key(text)
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached embeddings and reset the hit counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def cache_info(self) -> dict:
+        """Hit/miss counters and size, in the spirit of functools.lru_cache"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "maxsize": self.max_entries,
+                "currsize": len(self._entries),
+            }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class EmbeddingService:
     """Service for generating embeddings using Azure OpenAI"""
@@ -17,16 +124,43 @@ class EmbeddingService:
     def __init__(self):
         """Initialize the embedding service"""
         self.client = None
+        self.async_client: Optional["AsyncAzureOpenAI"] = None
+        self.local_cache = LocalEmbeddingCache(settings.embedding_cache_max_entries)
+        self._health_status: Optional[bool] = None
+        self._health_checked_at = 0.0
         self._initialize_client()
     
     def _initialize_client(self):
-        """Initialize Azure OpenAI client"""
+        """Initialize Azure OpenAI client
+        
+        openai and httpx are imported here so processes without credentials
+        (tests, imports with random embeddings) never load them.
+        """
         try:
             if settings.azure_openai_endpoint and settings.azure_openai_api_key:
+                import httpx
+                from openai import AsyncAzureOpenAI, AzureOpenAI
+                
                 self.client = AzureOpenAI(
                     azure_endpoint=settings.azure_openai_endpoint,
                     api_key=settings.azure_openai_api_key,
-                    api_version=settings.azure_openai_api_version
+                    api_version=settings.azure_openai_api_version,
+                    max_retries=settings.openai_max_retries
+                )
+                # Async client for request handlers: one pooled HTTP/2
+                # connection set shared by all concurrent embedding calls
+                self.async_client = AsyncAzureOpenAI(
+                    azure_endpoint=settings.azure_openai_endpoint,
+                    api_key=settings.azure_openai_api_key,
+                    api_version=settings.azure_openai_api_version,
+                    max_retries=settings.openai_max_retries,
+                    http_client=httpx.AsyncClient(
+                        http2=HTTP2_AVAILABLE,
+                        limits=httpx.Limits(
+                            max_connections=settings.openai_max_connections,
+                            max_keepalive_connections=settings.openai_max_keepalive_connections
+                        )
+                    )
                 )
                 logger.info("Azure OpenAI client initialized successfully")
             else:
@@ -34,59 +168,312 @@ class EmbeddingService:
         except Exception as e:
             logger.error(f"Error initializing Azure OpenAI client: {e}")
     
+    def reload_client(self):
+        """Re-create the Azure OpenAI client from current settings"""
+        self.client = None
+        self.async_client = None
+        self._health_status = None
+        self._initialize_client()
+    
+    async def aclose(self):
+        """Close the async client's HTTP connections"""
+        if self.async_client:
+            await self.async_client.close()
+    
     def test_connection(self) -> bool:
         """Test connection to Azure OpenAI service"""
         try:
             if not self.client:
                 return False
             
-            # Test with a simple embedding request
-            test_embedding = self.generate_text_embedding("test")
+            # Test with a simple embedding request, bypassing the cache
+            test_embedding = self._request_batch_embeddings(["test"])[0]
             return len(test_embedding) > 0
         except Exception as e:
             logger.error(f"Azure OpenAI connection test failed: {e}")
             return False
     
+    async def test_connection_async(self) -> bool:
+        """Test connection to Azure OpenAI, reusing a recent result
+        
+        Health probes arrive far more often than the service changes state, so
+        the outcome is cached for settings.openai_health_cache_seconds.
+        """
+        now = time.monotonic()
+        if (self._health_status is not None
+                and now - self._health_checked_at < settings.openai_health_cache_seconds):
+            return self._health_status
+        
+        try:
+            test_embedding = (await self._request_batch_embeddings_async(["test"]))[0]
+            self._health_status = len(test_embedding) > 0
+        except Exception as e:
+            logger.error(f"Azure OpenAI connection test failed: {e}")
+            self._health_status = False
+        self._health_checked_at = time.monotonic()
+        return self._health_status
+    
     def generate_text_embedding(self, text: str) -> List[float]:
         """Generate embedding for a single text string"""
+        return self.generate_batch_embeddings([text])[0]
+    
+    async def generate_text_embedding_async(self, text: str) -> List[float]:
+        """Generate embedding for a single text string without blocking the event loop"""
+        return (await self.generate_batch_embeddings_async([text]))[0]
+    
+    @staticmethod
+    def _prepare_text(text: str) -> Union[List[int], str]:
+        """Clean whitespace and truncate to settings.embedding_max_tokens
+        
+        Returns token ids when the tokenizer is available; the embeddings API
+        accepts them directly, so the text is tokenized only once.
+        """
+        cleaned_text = text.strip().translate(WHITESPACE_TABLE)
+        
+        tokenizer = get_tokenizer()
+        if tokenizer is None:
+            # Roughly 3 characters per token for English text
+            return cleaned_text[:settings.embedding_max_tokens * 3]
+        return tokenizer.encode(cleaned_text, disallowed_special=())[:settings.embedding_max_tokens]
+    
+    @classmethod
+    def _prepare_batch(cls, batch: List[str]) -> List[Union[List[int], str]]:
+        """_prepare_text for one request's worth of texts"""
+        return [cls._prepare_text(text) for text in batch]
+    
+    def _split_cached(self, texts: List[str]) -> Tuple[List[Optional[List[float]]], List[str]]:
+        """Embeddings found in the local cache (None on a miss) and the distinct missing texts"""
+        if not settings.cache_embeddings:
+            return [None] * len(texts), list(dict.fromkeys(texts))
+        
+        cached = [self.local_cache.get(text) for text in texts]
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, cached) if embedding is None))
+        return cached, missing
+    
+    def _merge_cached(self, texts: List[str], cached: List[Optional[List[float]]],
+                      missing: List[str], new_embeddings: List[List[float]]) -> List[List[float]]:
+        """Fill cache misses with newly generated embeddings and remember them"""
+        fresh = dict(zip(missing, new_embeddings))
+        if settings.cache_embeddings:
+            for text, embedding in fresh.items():
+                self.local_cache.put(text, embedding)
+        return [embedding if embedding is not None else fresh[text] for text, embedding in zip(texts, cached)]
+    
+    async def generate_batch_embeddings_async(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for a batch of texts, reusing locally cached ones"""
+        cached, missing = self._split_cached(texts)
+        new_embeddings = await self._request_batch_embeddings_async(missing) if missing else []
+        return self._merge_cached(texts, cached, missing, new_embeddings)
+    
+    async def _request_batch_embeddings_async(self, texts: List[str]) -> List[List[float]]:
+        """Request embeddings for a batch of texts without blocking the event loop
+        
+        Requests of settings.batch_size texts run concurrently, at most
+        settings.max_concurrent_requests at a time across all callers in the
+        process (see _request_slots). Each batch is tokenized in
+        a worker thread. Rate limiting (429) is handled by the client's retry
+        with backoff.
+        """
         try:
-            if not self.client:
+            if not self.async_client:
                 raise ValueError("Azure OpenAI client not initialized")
             
-            response = self.client.embeddings.create(
-                input=text,
-                model=settings.azure_openai_deployment_name
+            batch_size = settings.batch_size
+            semaphore = _request_slots()
+            
+            async def embed_batch(batch: List[str]) -> List[List[float]]:
+                inputs = await asyncio.to_thread(self._prepare_batch, batch)
+                async with semaphore:
+                    response = await self.async_client.embeddings.create(
+                        input=inputs,
+                        model=settings.azure_openai_deployment_name
+                    )
+                return [data.embedding for data in response.data]
+            
+            results = await asyncio.gather(
+                *(embed_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size))
             )
+            return [embedding for batch in results for embedding in batch]
             
-            embedding = response.data[0].embedding
+        except Exception as e:
+            logger.error(f"Error generating batch embeddings: {e}")
+            raise
+    
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        """SHA-256 of the whitespace-normalised text, used as the embedding cache key"""
+        canonical = " ".join(text.split())
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _cache_lookup(text_hashes) -> Select:
+        """Select stored embeddings for the current deployment and the given hashes"""
+        return select(EmbeddingCache.text_hash, EmbeddingCache.embedding).where(
+            EmbeddingCache.model_name == settings.azure_openai_deployment_name,
+            EmbeddingCache.text_hash.in_(set(text_hashes))
+        )
+    
+    @staticmethod
+    def _cache_uncached(hashes: Dict[str, str], stored: Dict[str, List[float]]) -> Dict[str, str]:
+        """Distinct texts, keyed by hash, found in neither cache"""
+        to_request = {}
+        for text, text_hash in hashes.items():
+            if text_hash not in stored:
+                to_request.setdefault(text_hash, text)
+        return to_request
+    
+    @staticmethod
+    def _cache_insert(to_request: Dict[str, str], new_embeddings: List[List[float]]):
+        """INSERT for newly generated embeddings, leaving concurrent inserts in place"""
+        rows = [
+            {"model_name": settings.azure_openai_deployment_name, "text_hash": text_hash, "embedding": embedding}
+            for text_hash, embedding in zip(to_request.keys(), new_embeddings)
+        ]
+        return insert(EmbeddingCache).on_conflict_do_nothing(), rows
+    
+    @staticmethod
+    def _stored_embeddings(rows) -> Dict[str, List[float]]:
+        """Map text hash to embedding list for rows read from the cache table"""
+        return {
+            text_hash: embedding.to_list() if hasattr(embedding, "to_list") else list(embedding)
+            for text_hash, embedding in rows
+        }
+    
+    def generate_embeddings_cached(self, texts: List[str], db: Session) -> List[List[float]]:
+        """Sync counterpart of generate_embeddings_cached_async, for scripts"""
+        if not settings.cache_embeddings:
+            return self._request_batch_embeddings(texts)
+        
+        cached, missing = self._split_cached(texts)
+        if not missing:
+            return cached
+        
+        hashes = {text: self._text_hash(text) for text in missing}
+        stored = self._stored_embeddings(db.execute(self._cache_lookup(hashes.values())).all())
+        
+        to_request = self._cache_uncached(hashes, stored)
+        if to_request:
+            new_embeddings = self._request_batch_embeddings(list(to_request.values()))
+            db.execute(*self._cache_insert(to_request, new_embeddings))
+            stored.update(zip(to_request.keys(), new_embeddings))
+        
+        return self._merge_cached(texts, cached, missing, [stored[hashes[text]] for text in missing])
+    
+    async def generate_embeddings_cached_async(self, texts: List[str], db: AsyncSession) -> List[List[float]]:
+        """Generate embeddings, reusing cached ones from memory or the embedding cache table
+        
+        Texts missing from the local cache are looked up in the table; only
+        those missing from both are sent to Azure OpenAI, and their embeddings
+        are then stored in the caller's transaction.
+        """
+        if not settings.cache_embeddings:
+            return await self._request_batch_embeddings_async(texts)
+        
+        cached, missing = self._split_cached(texts)
+        if not missing:
+            return cached
+        
+        hashes = {text: self._text_hash(text) for text in missing}
+        stored = self._stored_embeddings((await db.execute(self._cache_lookup(hashes.values()))).all())
+        
+        to_request = self._cache_uncached(hashes, stored)
+        if to_request:
+            new_embeddings = await self._request_batch_embeddings_async(list(to_request.values()))
+            await db.execute(*self._cache_insert(to_request, new_embeddings))
+            stored.update(zip(to_request.keys(), new_embeddings))
+        
+        logger.debug(
+            f"Embedding cache: {len(texts) - len(missing)} local hits, "
+            f"{len(missing) - len(to_request)} table hits, {len(to_request)} misses"
+        )
+        return self._merge_cached(texts, cached, missing, [stored[hashes[text]] for text in missing])
+    
+    async def _embed_texts_async(self, texts: List[str], db: Optional[AsyncSession]) -> List[List[float]]:
+        """Embed texts, through the embedding cache when a session is given"""
+        if db is not None:
+            return await self.generate_embeddings_cached_async(texts, db)
+        return await self.generate_batch_embeddings_async(texts)
+    
+    async def generate_customer_embeddings_async(
+        self, customer_data: dict, db: Optional[AsyncSession] = None
+    ) -> Tuple[List[float], List[float]]:
+        """Generate company name and full profile embeddings in a single request"""
+        try:
+            company_name = customer_data.get('company_name', '')
+            profile_text = self._build_customer_profile_text(customer_data)
             
-            # Convert numpy array to list if needed
-            if isinstance(embedding, np.ndarray):
-                embedding = embedding.tolist()
+            company_embedding, profile_embedding = await self._embed_texts_async(
+                [company_name, profile_text], db
+            )
+            return company_embedding, profile_embedding
             
-            return embedding
+        except Exception as e:
+            logger.error(f"Error generating customer embeddings: {e}")
+            raise
+    
+    async def generate_customer_embeddings_batch_async(
+        self, customers_data: List[dict], db: Optional[AsyncSession] = None
+    ) -> List[Tuple[List[float], List[float]]]:
+        """Async counterpart of generate_customer_embeddings_batch"""
+        try:
+            company_names = [data.get('company_name', '') for data in customers_data]
+            profile_texts = [self._build_customer_profile_text(data) for data in customers_data]
+            
+            embeddings = await self._embed_texts_async(company_names + profile_texts, db)
+            count = len(customers_data)
+            
+            return list(zip(embeddings[:count], embeddings[count:]))
             
         except Exception as e:
-            logger.error(f"Error generating text embedding: {e}")
+            logger.error(f"Error generating batch customer embeddings: {e}")
             raise
     
     def generate_customer_embeddings(self, customer_data: dict) -> Tuple[List[float], List[float]]:
         """Generate embeddings for customer company name and full profile"""
         try:
-            # Generate company name embedding
             company_name = customer_data.get('company_name', '')
-            company_embedding = self.generate_text_embedding(company_name)
-            
-            # Generate full profile embedding
             profile_text = self._build_customer_profile_text(customer_data)
-            profile_embedding = self.generate_text_embedding(profile_text)
             
+            # Company name and full profile embeddings in a single request
+            company_embedding, profile_embedding = self.generate_batch_embeddings(
+                [company_name, profile_text]
+            )
             return company_embedding, profile_embedding
             
         except Exception as e:
             logger.error(f"Error generating customer embeddings: {e}")
             raise
     
+    def generate_customer_embeddings_batch(
+        self, customers_data: List[dict], db: Optional[Session] = None
+    ) -> List[Tuple[List[float], List[float]]]:
+        """Generate company name and profile embeddings for many customers in batched requests
+        
+        With a session, embeddings go through the embedding cache table.
+        """
+        try:
+            company_names = [data.get('company_name', '') for data in customers_data]
+            profile_texts = [self._build_customer_profile_text(data) for data in customers_data]
+            
+            # One batched pass over both text kinds, split back afterwards
+            texts = company_names + profile_texts
+            if db is not None:
+                embeddings = self.generate_embeddings_cached(texts, db)
+            else:
+                embeddings = self.generate_batch_embeddings(texts)
+            count = len(customers_data)
+            
+            return list(zip(embeddings[:count], embeddings[count:]))
+            
+        except Exception as e:
+            logger.error(f"Error generating batch customer embeddings: {e}")
+            raise
+    
+    # Address fields in the order they appear in the profile text
+    _ADDRESS_FIELDS = (
+        'address_line1', 'address_line2', 'city', 'state_province', 'postal_code', 'country'
+    )
+    
     def _build_customer_profile_text(self, customer_data: dict) -> str:
         """Build a comprehensive text representation of customer data for embedding"""
         profile_parts = []
@@ -112,22 +499,9 @@ class EmbeddingService:
             profile_parts.append(f"Phone: {customer_data['phone']}")
         
         # Address information
-        address_parts = []
-        if customer_data.get('address_line1'):
-            address_parts.append(customer_data['address_line1'])
-        if customer_data.get('address_line2'):
-            address_parts.append(customer_data['address_line2'])
-        if customer_data.get('city'):
-            address_parts.append(customer_data['city'])
-        if customer_data.get('state_province'):
-            address_parts.append(customer_data['state_province'])
-        if customer_data.get('postal_code'):
-            address_parts.append(customer_data['postal_code'])
-        if customer_data.get('country'):
-            address_parts.append(customer_data['country'])
-        
-        if address_parts:
-            profile_parts.append(f"Address: {' '.join(address_parts)}")
+        address = " ".join(filter(None, map(customer_data.get, self._ADDRESS_FIELDS)))
+        if address:
+            profile_parts.append(f"Address: {address}")
         
         # Business information
         if customer_data.get('annual_revenue'):
@@ -141,37 +515,48 @@ class EmbeddingService:
         
         return " | ".join(profile_parts)
     
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Embed one request's worth of texts with the sync client"""
+        response = self.client.embeddings.create(
+            input=self._prepare_batch(batch),
+            model=settings.azure_openai_deployment_name
+        )
+        
+        batch_embeddings = []
+        for data in response.data:
+            embedding = data.embedding
+            # Convert numpy array to list if needed
+            if isinstance(embedding, np.ndarray):
+                embedding = embedding.tolist()
+            batch_embeddings.append(embedding)
+        return batch_embeddings
+    
     def generate_batch_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a batch of texts"""
+        """Generate embeddings for a batch of texts, reusing locally cached ones"""
+        cached, missing = self._split_cached(texts)
+        new_embeddings = self._request_batch_embeddings(missing) if missing else []
+        return self._merge_cached(texts, cached, missing, new_embeddings)
+    
+    def _request_batch_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Request embeddings for a batch of texts
+        
+        Requests of settings.batch_size texts are issued from a thread pool of
+        settings.max_concurrent_requests workers so their round-trips overlap.
+        Rate limiting (429) is handled by the client's retry with backoff.
+        """
         try:
             if not self.client:
                 raise ValueError("Azure OpenAI client not initialized")
             
-            embeddings = []
             batch_size = settings.batch_size
+            batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+            if len(batches) <= 1:
+                return self._embed_batch(batches[0]) if batches else []
             
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                
-                response = self.client.embeddings.create(
-                    input=batch,
-                    model=settings.azure_openai_deployment_name
-                )
-                
-                batch_embeddings = []
-                for data in response.data:
-                    embedding = data.embedding
-                    # Convert numpy array to list if needed
-                    if isinstance(embedding, np.ndarray):
-                        embedding = embedding.tolist()
-                    batch_embeddings.append(embedding)
-                embeddings.extend(batch_embeddings)
-                
-                # Add small delay to avoid rate limiting
-                if i + batch_size < len(texts):
-                    time.sleep(0.1)
+            with ThreadPoolExecutor(max_workers=min(settings.max_concurrent_requests, len(batches))) as executor:
+                results = list(executor.map(self._embed_batch, batches))
             
-            return embeddings
+            return [embedding for batch in results for embedding in batch]
             
         except Exception as e:
             logger.error(f"Error generating batch embeddings: {e}")
@@ -1,6 +1,6 @@
 """Business rules engine for customer matching confidence calculation"""
 import logging
-from typing import Any
+from typing import Any, Callable
 
 from app.core.config import settings
 from app.models.database import IncomingCustomer
@@ -13,62 +13,60 @@ class BusinessRulesEngine:
     
     def apply_rules(self, base_score: float, incoming: IncomingCustomer, customer_row: Any) -> float:
         """Apply business rules to adjust confidence score"""
-        confidence = base_score
+        return self.rules_for(incoming)(base_score, customer_row)
+    
+    def rules_for(self, incoming: IncomingCustomer) -> Callable[[float, Any], float]:
+        """Build the confidence adjustment for one incoming customer's candidates
         
+        Settings and the incoming customer's fields are resolved once here,
+        so the returned function only compares them with each candidate row.
+        Rules that cannot apply (e.g. no incoming revenue) are left out.
+        """
         if not settings.enable_business_rules:
-            return confidence
-        
-        # Industry match boost
-        confidence = self._apply_industry_rule(confidence, incoming, customer_row)
-        
-        # Location match boost/penalty
-        confidence = self._apply_location_rule(confidence, incoming, customer_row)
-        
-        # Revenue size boost
-        confidence = self._apply_revenue_rule(confidence, incoming, customer_row)
+            return lambda base_score, customer_row: base_score
         
-        return min(confidence, 1.0)  # Cap at 1.0
-    
-    def _apply_industry_rule(self, confidence: float, incoming: IncomingCustomer, customer_row: Any) -> float:
-        """Apply industry match boost"""
-        if (incoming.industry is not None and 
-            hasattr(customer_row, 'industry') and 
-            customer_row.industry is not None and 
-            incoming.industry.lower() == customer_row.industry.lower()):
-            confidence *= settings.industry_match_boost
-        
-        return confidence
-    
-    def _apply_location_rule(self, confidence: float, incoming: IncomingCustomer, customer_row: Any) -> float:
-        """Apply location match boost or penalty"""
-        if (incoming.country is not None and 
-            hasattr(customer_row, 'country') and 
-            customer_row.country is not None and 
-            incoming.country.lower() == customer_row.country.lower()):
-            confidence *= settings.location_match_boost
-        else:
-            # Country mismatch penalty
-            confidence *= settings.country_mismatch_penalty
+        industry = incoming.industry.lower() if incoming.industry is not None else None
+        country = incoming.country.lower() if incoming.country is not None else None
+        industry_boost = settings.industry_match_boost
+        location_boost = settings.location_match_boost
+        country_mismatch_penalty = settings.country_mismatch_penalty
         
-        return confidence
-    
-    def _apply_revenue_rule(self, confidence: float, incoming: IncomingCustomer, customer_row: Any) -> float:
-        """Apply revenue size boost"""
-        if not settings.revenue_size_boost:
-            return confidence
-        
-        if (incoming.annual_revenue is not None and 
-            hasattr(customer_row, 'annual_revenue') and 
-            customer_row.annual_revenue is not None):
-            
+        revenue = None
+        if settings.revenue_size_boost and incoming.annual_revenue is not None:
             try:
-                incoming_revenue = float(incoming.annual_revenue)  # type: ignore
-                customer_revenue = float(customer_row.annual_revenue)
-                revenue_ratio = min(incoming_revenue, customer_revenue) / max(incoming_revenue, customer_revenue)
-                
-                if revenue_ratio > 0.8:  # Within 20% of each other
-                    confidence *= 1.1
-            except (ValueError, ZeroDivisionError):
+                revenue = float(incoming.annual_revenue)  # type: ignore
+            except ValueError:
                 logger.warning("Error calculating revenue ratio for business rules")
         
-        return confidence 
\ No newline at end of file
+        def apply(base_score: float, customer_row: Any) -> float:
+            confidence = base_score
+            
+            # Industry match boost
+            if industry is not None:
+                customer_industry = getattr(customer_row, 'industry', None)
+                if customer_industry is not None and customer_industry.lower() == industry:
+                    confidence *= industry_boost
+            
+            # Location match boost, or country mismatch penalty
+            customer_country = getattr(customer_row, 'country', None) if country is not None else None
+            if customer_country is not None and customer_country.lower() == country:
+                confidence *= location_boost
+            else:
+                confidence *= country_mismatch_penalty
+            
+            # Revenue size boost
+            if revenue is not None:
+                customer_revenue = getattr(customer_row, 'annual_revenue', None)
+                if customer_revenue is not None:
+                    try:
+                        customer_revenue = float(customer_revenue)
+                        revenue_ratio = min(revenue, customer_revenue) / max(revenue, customer_revenue)
+                        
+                        if revenue_ratio > 0.8:  # Within 20% of each other
+                            confidence *= 1.1
+                    except (ValueError, ZeroDivisionError):
+                        logger.warning("Error calculating revenue ratio for business rules")
+            
+            return min(confidence, 1.0)  # Cap at 1.0
+        
+        return apply
@@ -3,7 +3,7 @@ import logging
 from datetime import datetime
 from typing import List, Dict
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import case, func, literal, or_, select
 
 from app.core.config import settings
 from app.models.database import Customer, IncomingCustomer
@@ -13,6 +13,9 @@ from .utils import MatchingUtils
 
 logger = logging.getLogger(__name__)
 
+# Bit per exact-match field in the match mask computed for each candidate
+FIELD_BITS = {'company_name': 1, 'email': 2, 'phone': 4}
+
 
 class ExactMatcher(BaseMatcher):
     """Handles exact matching based on company name, email, and phone"""
@@ -36,28 +39,44 @@ class ExactMatcher(BaseMatcher):
         if not conditions:
             return matches
         
-        # Query for exact matches
-        exact_customers = db.query(Customer).filter(or_(*conditions)).all()
+        # Each candidate is scored in SQL as a bitmask of its matching fields;
+        # masks scoring below the minimum are filtered out on the server
+        score_table = self._score_table(exact_criteria)
+        qualifying_masks = [
+            mask for mask, score in enumerate(score_table) if score >= settings.exact_match_min_score
+        ]
+        if not qualifying_masks:
+            return matches
         
-        for customer in exact_customers:
-            score = self._calculate_exact_match_score(incoming_customer, customer, exact_criteria)
+        mask = self._mask_expression(exact_criteria)
+        rows = db.execute(
+            select(
+                Customer.customer_id, Customer.company_name, Customer.contact_name, Customer.email,
+                mask.label("mask")
+            )
+            .where(or_(*conditions))
+            .where(mask.in_(qualifying_masks))
+        ).all()
+        created_date = datetime.now()
+        matched_fields = list(exact_criteria.keys())
+        
+        for row in rows:
+            score = score_table[row.mask]
+            match_type = self._determine_match_type(score)
+            confidence = min(score * 1.2, 1.0)  # Boost confidence for exact matches
             
-            if score >= settings.exact_match_min_score:
-                match_type = self._determine_match_type(score)
-                confidence = min(score * 1.2, 1.0)  # Boost confidence for exact matches
-                
-                matches.append(MatchResultSchema(
-                    match_id=0,  # Will be set by database
-                    matched_customer_id=customer.customer_id,  # type: ignore
-                    matched_company_name=customer.company_name,  # type: ignore
-                    matched_contact_name=customer.contact_name,  # type: ignore
-                    matched_email=customer.email,  # type: ignore
-                    similarity_score=score,
-                    match_type=match_type,
-                    confidence_level=confidence,
-                    match_criteria={"exact_match": True, "matched_fields": list(exact_criteria.keys())},
-                    created_date=datetime.now()
-                ))
+            matches.append(MatchResultSchema(
+                match_id=0,  # Will be set by database
+                matched_customer_id=row.customer_id,
+                matched_company_name=row.company_name,
+                matched_contact_name=row.contact_name,
+                matched_email=row.email,
+                similarity_score=score,
+                match_type=match_type,
+                confidence_level=confidence,
+                match_criteria={"exact_match": True, "matched_fields": matched_fields},
+                created_date=created_date
+            ))
         
         return matches
     
@@ -71,58 +90,93 @@ class ExactMatcher(BaseMatcher):
         if incoming_customer.email is not None:
             exact_criteria['email'] = incoming_customer.email.strip().lower()
         
-        if incoming_customer.phone is not None:
-            exact_criteria['phone'] = incoming_customer.phone.strip()
+        # Phones compare on digits only, against the generated phone_digits column
+        phone_digits = MatchingUtils.normalize_phone(incoming_customer.phone)
+        if phone_digits:
+            exact_criteria['phone'] = phone_digits
         
         return exact_criteria
     
     def _build_query_conditions(self, exact_criteria: Dict[str, str]) -> List:
-        """Build SQLAlchemy query conditions for exact matching"""
+        """Build SQLAlchemy query conditions for exact matching
+        
+        Email and phone only score on equality, so they are looked up with
+        indexed equality (lower(email) has an expression index and phones are
+        compared on the indexed phone_digits column) rather than ILIKE.
+        Company names score on containment and keep the pattern match.
+        """
         conditions = []
         
         for field, value in exact_criteria.items():
             if field == 'company_name':
                 conditions.append(Customer.company_name.ilike(f"%{value}%"))
             elif field == 'email':
-                conditions.append(Customer.email.ilike(f"%{value}%"))
+                conditions.append(func.lower(Customer.email) == value)
             elif field == 'phone':
-                conditions.append(Customer.phone.ilike(f"%{value}%"))
+                conditions.append(Customer.phone_digits == value)
         
         return conditions
     
     def _calculate_exact_match_score(self, incoming: IncomingCustomer, customer: Customer, criteria: Dict[str, str]) -> float:
-        """Calculate exact match score based on matched fields"""
-        total_score = 0.0
-        total_weight = 0.0
+        """Calculate exact match score for a loaded customer, as find_matches scores it in SQL"""
+        mask = 0
         
         # Company name matching
         if 'company_name' in criteria:
             incoming_name = criteria['company_name']
             customer_name = customer.company_name.lower() if customer.company_name is not None else ""
-            
             if incoming_name in customer_name or customer_name in incoming_name:
-                total_score += settings.exact_company_name_weight
-            total_weight += settings.exact_company_name_weight
+                mask |= FIELD_BITS['company_name']
         
         # Email matching
         if 'email' in criteria:
-            incoming_email = criteria['email']
             customer_email = customer.email.lower() if customer.email is not None else ""
-            
-            if incoming_email == customer_email:
-                total_score += settings.exact_email_weight
-            total_weight += settings.exact_email_weight
+            if criteria['email'] == customer_email:
+                mask |= FIELD_BITS['email']
         
         # Phone matching
         if 'phone' in criteria:
-            incoming_phone = criteria['phone']
-            customer_phone = customer.phone if customer.phone is not None else ""
-            
-            if incoming_phone == customer_phone:
-                total_score += settings.exact_phone_weight
-            total_weight += settings.exact_phone_weight
+            if criteria['phone'] == MatchingUtils.normalize_phone(customer.phone):
+                mask |= FIELD_BITS['phone']
+        
+        return self._score_table(criteria)[mask]
+    
+    def _mask_expression(self, criteria: Dict[str, str]):
+        """SQL expression for the bitmask of fields a customer matches (see FIELD_BITS)"""
+        terms = []
         
-        return total_score / total_weight if total_weight > 0 else 0.0
+        if 'company_name' in criteria:
+            customer_name = func.lower(Customer.company_name)
+            incoming_name = literal(criteria['company_name'])
+            terms.append(case(
+                (or_(func.strpos(customer_name, incoming_name) > 0,
+                     func.strpos(incoming_name, customer_name) > 0), FIELD_BITS['company_name']),
+                else_=0
+            ))
+        
+        if 'email' in criteria:
+            terms.append(case((func.lower(Customer.email) == criteria['email'], FIELD_BITS['email']), else_=0))
+        
+        if 'phone' in criteria:
+            terms.append(case((Customer.phone_digits == criteria['phone'], FIELD_BITS['phone']), else_=0))
+        
+        return sum(terms[1:], terms[0])
+    
+    def _score_table(self, criteria: Dict[str, str]) -> List[float]:
+        """Score for each of the 8 field masks, weighted over the fields in criteria"""
+        weights = {
+            'company_name': settings.exact_company_name_weight,
+            'email': settings.exact_email_weight,
+            'phone': settings.exact_phone_weight,
+        }
+        total_weight = sum(weights[field] for field in criteria)
+        if total_weight <= 0:
+            return [0.0] * 8
+        
+        return [
+            sum(weights[field] for field in criteria if mask & FIELD_BITS[field]) / total_weight
+            for mask in range(8)
+        ]
     
     def _determine_match_type(self, score: float) -> str:
         """Determine match type based on similarity score"""
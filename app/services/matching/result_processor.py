@@ -1,14 +1,50 @@
 """Result processing and storage for customer matching"""
 import logging
-from typing import List
+from typing import Dict, List
 from datetime import datetime
+import orjson
+from sqlalchemy import text, update
 from sqlalchemy.orm import Session
 
-from app.models.database import MatchingResult, IncomingCustomer
+from app.models.database import IncomingCustomer
 from app.models.schemas import MatchResult as MatchResultSchema
 
 logger = logging.getLogger(__name__)
 
+# Writable CTE: the INSERT and the status UPDATE run as one statement. The
+# UPDATE is driven by request_ids so requests without matches are marked too.
+STORE_RESULTS_STATEMENT = text("""
+    WITH inserted AS (
+        INSERT INTO customer_data.matching_results (
+            incoming_customer_id, matched_customer_id, similarity_score,
+            match_type, match_criteria, confidence_level
+        )
+        SELECT
+            m.incoming_customer_id,
+            m.matched_customer_id,
+            m.similarity_score,
+            m.match_type,
+            CAST(m.match_criteria AS jsonb),
+            m.confidence_level
+        FROM unnest(
+            CAST(:incoming_customer_ids AS integer[]),
+            CAST(:matched_customer_ids AS integer[]),
+            CAST(:similarity_scores AS real[]),
+            CAST(:match_types AS text[]),
+            CAST(:match_criteria AS text[]),
+            CAST(:confidence_levels AS real[])
+        ) AS m(incoming_customer_id, matched_customer_id, similarity_score,
+               match_type, match_criteria, confidence_level)
+        RETURNING match_id, incoming_customer_id, matched_customer_id
+    ),
+    updated AS (
+        UPDATE customer_data.incoming_customers
+        SET processing_status = 'processed', processed_date = :processed_date
+        WHERE request_id = ANY(CAST(:request_ids AS integer[]))
+    )
+    SELECT match_id, incoming_customer_id, matched_customer_id FROM inserted
+""")
+
 
 class ResultProcessor:
     """Handles processing and storage of matching results"""
@@ -29,62 +65,124 @@ class ResultProcessor:
         """Sort matches by confidence level in descending order"""
         return sorted(matches, key=lambda x: x.confidence_level, reverse=True)
     
-    def store_matching_results(self, request_id: int, matches: List[MatchResultSchema], db: Session) -> bool:
-        """Store matching results in database"""
+    def store_matching_results(self, request_id: int, matches: List[MatchResultSchema], db: Session,
+                               commit: bool = True) -> bool:
+        """Store matching results in database
+        
+        The matches are inserted and the incoming customer is marked processed
+        by a single statement. With commit=False the caller owns the
+        transaction and errors propagate.
+        """
         try:
-            # Store matching results
-            for match in matches:
-                db_result = MatchingResult(
-                    incoming_customer_id=request_id,
-                    matched_customer_id=match.matched_customer_id,
-                    similarity_score=match.similarity_score,
-                    match_type=match.match_type,
-                    match_criteria=match.match_criteria,
-                    confidence_level=match.confidence_level
-                )
-                db.add(db_result)
-            
-            # Update incoming customer processing status
-            self.update_processing_status(request_id, "processed", db)
+            self._write_results({request_id: matches}, db)
             
-            db.commit()
+            if commit:
+                db.commit()
             logger.info(f"Stored {len(matches)} matching results for request_id {request_id}")
             return True
             
         except Exception as e:
+            if not commit:
+                raise
             db.rollback()
             logger.error(f"Error storing matching results: {e}")
             return False
     
-    def process_results(self, matches: List[MatchResultSchema], request_id: int, db: Session) -> List[MatchResultSchema]:
-        """Process and store matching results"""
-        # Deduplicate matches
-        unique_matches = self.deduplicate_matches(matches)
+    def store_batch_results(self, matches_by_request: Dict[int, List[MatchResultSchema]], db: Session,
+                            commit: bool = True) -> bool:
+        """Store matching results for many incoming customers
         
-        # Sort by confidence
-        sorted_matches = self.sort_matches(unique_matches)
+        One statement inserts the matches of every request and marks them all
+        processed. Errors are handled as in store_matching_results.
+        """
+        try:
+            self._write_results(matches_by_request, db)
+            
+            if commit:
+                db.commit()
+            logger.info(f"Stored matching results for {len(matches_by_request)} requests")
+            return True
+            
+        except Exception as e:
+            if not commit:
+                raise
+            db.rollback()
+            logger.error(f"Error storing batch matching results: {e}")
+            return False
+    
+    def _write_results(self, matches_by_request: Dict[int, List[MatchResultSchema]], db: Session):
+        """Insert matches and mark their requests processed in one round-trip
+        
+        Match columns are sent as parallel arrays and unnested server-side.
+        The generated match_id is written back onto each match; matches are
+        deduplicated per request, so (request, customer) identifies each row.
+        """
+        if not matches_by_request:
+            return
+        
+        request_matches = [
+            (request_id, match) for request_id, matches in matches_by_request.items() for match in matches
+        ]
+        rows = db.execute(
+            STORE_RESULTS_STATEMENT,
+            {
+                "request_ids": list(matches_by_request),
+                "incoming_customer_ids": [request_id for request_id, _ in request_matches],
+                "matched_customer_ids": [match.matched_customer_id for _, match in request_matches],
+                "similarity_scores": [float(match.similarity_score) for _, match in request_matches],
+                "match_types": [match.match_type for _, match in request_matches],
+                "match_criteria": [
+                    orjson.dumps(match.match_criteria).decode() if match.match_criteria is not None else None
+                    for _, match in request_matches
+                ],
+                "confidence_levels": [float(match.confidence_level) for _, match in request_matches],
+                "processed_date": datetime.now()
+            }
+        ).all()
+        
+        match_ids = {(row.incoming_customer_id, row.matched_customer_id): row.match_id for row in rows}
+        for request_id, match in request_matches:
+            match.match_id = match_ids[(request_id, match.matched_customer_id)]
+    
+    def rank_matches(self, matches: List[MatchResultSchema]) -> List[MatchResultSchema]:
+        """Deduplicate matches and sort them by confidence"""
+        return self.sort_matches(self.deduplicate_matches(matches))
+    
+    def process_results(self, matches: List[MatchResultSchema], request_id: int, db: Session,
+                        commit: bool = True) -> List[MatchResultSchema]:
+        """Process and store matching results"""
+        sorted_matches = self.rank_matches(matches)
         
         # Store in database (this will also update processing status)
-        self.store_matching_results(request_id, sorted_matches, db)
+        self.store_matching_results(request_id, sorted_matches, db, commit=commit)
         
         return sorted_matches
     
-    def update_processing_status(self, request_id: int, status: str, db: Session) -> bool:
-        """Update processing status for incoming customer"""
+    def update_processing_status(self, request_id: int, status: str, db: Session,
+                                 commit: bool = True) -> bool:
+        """Update processing status for incoming customer with a single UPDATE"""
         try:
-            incoming_customer = db.query(IncomingCustomer).filter(IncomingCustomer.request_id == request_id).first()
-            if incoming_customer:
-                setattr(incoming_customer, 'processing_status', status)
-                if status == "processed":
-                    setattr(incoming_customer, 'processed_date', datetime.now())
+            values = {"processing_status": status}
+            if status == "processed":
+                values["processed_date"] = datetime.now()
+            
+            result = db.execute(
+                update(IncomingCustomer)
+                .where(IncomingCustomer.request_id == request_id)
+                .values(**values)
+            )
+            if result.rowcount:
                 logger.info(f"Updated processing status for request_id {request_id}: {status}")
-                db.commit()
+                if commit:
+                    db.commit()
                 return True
             else:
                 logger.warning(f"Incoming customer with request_id {request_id} not found for status update")
                 return False
                 
         except Exception as e:
+            if not commit:
+                raise
             db.rollback()
             logger.error(f"Error updating processing status: {e}")
-            return False 
\ No newline at end of file
+            return False
@@ -1,9 +1,12 @@
 """Utility functions for customer matching"""
 import logging
+import re
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+_NON_DIGITS = re.compile(r"\D")
+
 
 class MatchingUtils:
     """Utility functions for customer matching operations"""
@@ -22,6 +25,13 @@ class MatchingUtils:
             return False
         return customer_email.strip().lower() == incoming_email.strip().lower()
     
+    @staticmethod
+    def normalize_phone(phone: Optional[str]) -> str:
+        """Digits of a phone number, as stored in customers.phone_digits"""
+        if not phone:
+            return ""
+        return _NON_DIGITS.sub("", phone)
+    
     @staticmethod
     def exact_match_phone(customer_phone: str, incoming_phone: str) -> bool:
         """Check if phone numbers match exactly"""
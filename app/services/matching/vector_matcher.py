@@ -2,13 +2,15 @@
 import logging
 import numpy as np
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Tuple
+from pgvector import HalfVector
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import ARRAY, Text, bindparam, text
 
 from app.core.config import settings
-from app.models.database import IncomingCustomer
+from app.models.database import HalfVec, IncomingCustomer, halfvec_literal
 from app.models.schemas import MatchResult as MatchResultSchema
+from app.services.query_cache import match_cache
 from .base_matcher import BaseMatcher
 from .business_rules import BusinessRulesEngine
 from .utils import MatchingUtils
@@ -16,6 +18,69 @@ from .utils import MatchingUtils
 logger = logging.getLogger(__name__)
 
 
+# Statements are built once at import; their compiled form is then reused
+# from SQLAlchemy's statement cache and, on asyncpg, the prepared statement cache
+VECTOR_MATCH_QUERY = text("""
+    WITH distance_calc AS (
+        SELECT 
+            customer_id, 
+            company_name, 
+            contact_name, 
+            email,
+            industry,
+            country,
+            annual_revenue / 100.0 AS annual_revenue,  -- stored as cents
+            full_profile_embedding <=> CAST(:query_embedding AS halfvec(1536)) as distance
+        FROM customer_data.customers 
+        WHERE full_profile_embedding IS NOT NULL
+    )
+    SELECT 
+        customer_id, 
+        company_name, 
+        contact_name, 
+        email,
+        industry,
+        country,
+        annual_revenue,
+        (1 - distance) as similarity_score
+    FROM distance_calc
+    WHERE (1 - distance) > :threshold
+    ORDER BY distance  -- Sort by distance (ascending = most similar first)
+    LIMIT :max_results
+""").bindparams(bindparam("query_embedding", type_=HalfVec(1536)))
+
+BATCH_VECTOR_MATCH_QUERY = text("""
+    SELECT
+        q.ord,
+        s.customer_id,
+        s.company_name,
+        s.contact_name,
+        s.email,
+        s.industry,
+        s.country,
+        s.annual_revenue,
+        s.similarity_score
+    FROM unnest(CAST(:query_embeddings AS text[])) WITH ORDINALITY AS q(embedding, ord)
+    CROSS JOIN LATERAL (
+        SELECT
+            customer_id,
+            company_name,
+            contact_name,
+            email,
+            industry,
+            country,
+            annual_revenue / 100.0 AS annual_revenue,  -- stored as cents
+            1 - (full_profile_embedding <=> CAST(q.embedding AS halfvec(1536))) as similarity_score
+        FROM customer_data.customers
+        WHERE full_profile_embedding IS NOT NULL
+        ORDER BY full_profile_embedding <=> CAST(q.embedding AS halfvec(1536))
+        LIMIT :max_results
+    ) s
+    WHERE s.similarity_score > :threshold
+    ORDER BY q.ord, s.similarity_score DESC
+""").bindparams(bindparam("query_embeddings", type_=ARRAY(Text)))
+
+
 class VectorMatcher(BaseMatcher):
     """Handles vector similarity matching using embeddings"""
     
@@ -35,18 +100,70 @@ class VectorMatcher(BaseMatcher):
         if incoming_customer.full_profile_embedding is None:
             return []
         
-        matches = []
         query_embedding = self._prepare_embedding(incoming_customer.full_profile_embedding)
         
-        # Query for vector similarity matches
-        results = self._execute_vector_query(query_embedding, db)
+        # Query for vector similarity matches, unless the same embedding was
+        # matched recently
+        cache_params = self._cache_params()
+        results = match_cache.get_by_embedding(query_embedding, cache_params) if settings.enable_match_cache else None
+        if results is None:
+            results = self._execute_vector_query(query_embedding, db)
+            if settings.enable_match_cache:
+                match_cache.put(None, query_embedding, cache_params, results)
+        
+        return self._build_matches(incoming_customer, results, datetime.now())
+    
+    def find_matches_batch(self, incoming_customers: List[IncomingCustomer],
+                           db: Session) -> Dict[int, List[MatchResultSchema]]:
+        """Find vector matches for many incoming customers at once
+        
+        Cache hits are served directly; all misses share one LATERAL query,
+        so a batch costs a single round-trip however many customers it holds.
+        Returns matches keyed by request_id.
+        """
+        matches = {getattr(customer, 'request_id'): [] for customer in incoming_customers}
+        if not self.is_enabled():
+            return matches
+        
+        cache_params = self._cache_params()
+        created_date = datetime.now()
+        misses = []
+        for customer in incoming_customers:
+            if customer.full_profile_embedding is None:
+                continue
+            
+            query_embedding = self._prepare_embedding(customer.full_profile_embedding)
+            results = match_cache.get_by_embedding(query_embedding, cache_params) if settings.enable_match_cache else None
+            if results is None:
+                misses.append((customer, query_embedding))
+            else:
+                matches[getattr(customer, 'request_id')] = self._build_matches(customer, results, created_date)
+        
+        if misses:
+            rows_by_query: Dict[int, list] = {ordinal: [] for ordinal in range(1, len(misses) + 1)}
+            for row in self._execute_batch_vector_query([embedding for _, embedding in misses], db):
+                rows_by_query[row.ord].append(row)
+            
+            for ordinal, (customer, query_embedding) in enumerate(misses, start=1):
+                results = rows_by_query[ordinal]
+                if settings.enable_match_cache:
+                    match_cache.put(None, query_embedding, cache_params, results)
+                matches[getattr(customer, 'request_id')] = self._build_matches(customer, results, created_date)
         
+        return matches
+    
+    def _build_matches(self, incoming_customer: IncomingCustomer, results,
+                       created_date: datetime) -> List[MatchResultSchema]:
+        """Match results for the candidate rows of one incoming customer"""
+        matches = []
+        # Business rules are specialised to this incoming customer once
+        apply_rules = self.business_rules.rules_for(incoming_customer)
         for row in results:
             similarity_score = float(row.similarity_score)
             match_type = self._determine_match_type(similarity_score)
             
             # Apply business rules for confidence calculation
-            confidence = self.business_rules.apply_rules(similarity_score, incoming_customer, row)
+            confidence = apply_rules(similarity_score, row)
             
             matches.append(MatchResultSchema(
                 match_id=0,
@@ -58,53 +175,39 @@ class VectorMatcher(BaseMatcher):
                 match_type=match_type,
                 confidence_level=confidence,
                 match_criteria={"vector_similarity": True, "embedding_score": similarity_score},
-                created_date=datetime.now()
+                created_date=created_date
             ))
         
         return matches
     
+    @staticmethod
+    def _cache_params() -> Tuple[float, int]:
+        """Search parameters that cached candidate rows depend on"""
+        return (settings.vector_similarity_threshold, settings.vector_max_results)
+    
     def _prepare_embedding(self, embedding) -> List[float]:
-        """Convert numpy array to list if needed and validate normalization"""
-        if isinstance(embedding, np.ndarray):
-            embedding_list = embedding.tolist()
-        else:
-            embedding_list = embedding
+        """Convert a stored embedding to a list of floats and validate normalization"""
+        # halfvec columns load as pgvector HalfVector objects
+        if isinstance(embedding, HalfVector):
+            embedding = embedding.to_numpy()
+        vector = np.asarray(embedding, dtype=np.float32)
         
         # Validate embedding is normalized for accurate cosine similarity
         # For production, embeddings should have magnitude ~1.0
-        magnitude = sum(x * x for x in embedding_list) ** 0.5
+        magnitude = float(np.sqrt(np.dot(vector, vector)))
         if not (0.99 <= magnitude <= 1.01):
             logger.warning(f"Embedding not normalized: magnitude={magnitude:.4f}")
         
-        return embedding_list
+        return vector.tolist()
     
     def _execute_vector_query(self, query_embedding: List[float], db: Session):
-        """Execute vector similarity query with optimized distance calculation"""
-        query = text("""
-            WITH distance_calc AS (
-                SELECT 
-                    customer_id, 
-                    company_name, 
-                    contact_name, 
-                    email,
-                    full_profile_embedding <=> CAST(:query_embedding AS vector(1536)) as distance
-                FROM customer_data.customers 
-                WHERE full_profile_embedding IS NOT NULL
-            )
-            SELECT 
-                customer_id, 
-                company_name, 
-                contact_name, 
-                email,
-                (1 - distance) as similarity_score
-            FROM distance_calc
-            WHERE (1 - distance) > :threshold
-            ORDER BY distance  -- Sort by distance (ascending = most similar first)
-            LIMIT :max_results
-        """)
+        """Execute vector similarity query with optimized distance calculation
         
+        Rows also carry the columns the business rules read, so confidence is
+        adjusted without loading the matched customers again.
+        """
         return db.execute(
-            query,
+            VECTOR_MATCH_QUERY,
             {
                 "query_embedding": query_embedding,
                 "threshold": settings.vector_similarity_threshold,
@@ -112,6 +215,22 @@ class VectorMatcher(BaseMatcher):
             }
         ).fetchall()
     
+    def _execute_batch_vector_query(self, query_embeddings: List[List[float]], db: Session):
+        """Execute one similarity query per embedding in a single statement
+        
+        Rows carry the 1-based position of their query embedding as ``ord``.
+        The LIMIT inside the LATERAL subquery lets each search use the HNSW index.
+        """
+        return db.execute(
+            BATCH_VECTOR_MATCH_QUERY,
+            {
+                # Text literals: halfvec arrays have no binary codec on either driver
+                "query_embeddings": [halfvec_literal(embedding) for embedding in query_embeddings],
+                "threshold": settings.vector_similarity_threshold,
+                "max_results": settings.vector_max_results
+            }
+        ).fetchall()
+    
     def _determine_match_type(self, score: float) -> str:
         """Determine match type based on similarity score"""
         return MatchingUtils.determine_match_type(
@@ -0,0 +1,180 @@
+"""Semantic query cache for similarity search results"""
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    """Cached search results for one query"""
+    embedding: np.ndarray
+    params: Hashable
+    results: List[Any]
+    created_at: float
+
+
+class SemanticQueryCache:
+    """LRU cache of search results keyed by query text and query embedding
+
+    Lookups happen in two steps:
+
+    1. Exact hit on the normalised query text. This skips the embedding call.
+    2. Approximate hit when a cached query embedding has cosine similarity of
+       at least ``similarity_threshold`` to the new one. This skips the
+       database query.
+
+    Only entries created with the same search parameters are considered.
+    Entries stored without query text (e.g. matching on a stored embedding)
+    are keyed by the embedding itself; get_by_embedding() finds them only for
+    the identical embedding, for callers that cannot reuse another query's
+    scores.
+    """
+
+    def __init__(self, max_entries: int = 256, similarity_threshold: float = 0.97,
+                 ttl_seconds: float = 300.0):
+        """Initialize an empty cache"""
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+
+        # Stacked (N, dim) key matrix, rebuilt lazily after changes. Keys are
+        # stored as fp16 and widened once here so the lookup matmul uses BLAS.
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+
+    @staticmethod
+    def _text_key(query_text: str, params: Hashable) -> str:
+        """Hash of the normalised query text and search parameters"""
+        normalized = " ".join(query_text.lower().split())
+        return hashlib.sha1(f"{normalized}|{params!r}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        """Unit-length float32 copy of an embedding"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    @classmethod
+    def _key_embedding(cls, embedding) -> np.ndarray:
+        """Normalised fp16 embedding stored with each entry"""
+        return cls._normalize(embedding).astype(np.float16)
+
+    @staticmethod
+    def _embedding_key(key_embedding: np.ndarray, params: Hashable) -> str:
+        """Hash of the fp16 key embedding bytes and search parameters"""
+        return hashlib.sha1(key_embedding.tobytes() + repr(params).encode("utf-8")).hexdigest()
+
+    def _is_expired(self, entry: _CacheEntry) -> bool:
+        return time.monotonic() - entry.created_at > self.ttl_seconds
+
+    def _evict(self, key: str):
+        self._entries.pop(key, None)
+        self._matrix = None
+
+    def get_by_text(self, query_text: str, params: Hashable) -> Optional[List[Any]]:
+        """Return cached results for an identical (normalised) query"""
+        return self._get(self._text_key(query_text, params))
+
+    def _get(self, key: str) -> Optional[List[Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._is_expired(entry):
+            self._evict(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.results
+
+    def get_by_embedding(self, embedding, params: Hashable) -> Optional[List[Any]]:
+        """Return cached results stored without query text for this exact embedding"""
+        return self._get(self._embedding_key(self._key_embedding(embedding), params))
+
+    def get_similar(self, embedding, params: Hashable) -> Optional[List[Any]]:
+        """Return cached results for the most similar cached query, if close enough"""
+        if not self._entries:
+            return None
+
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries.keys())
+            self._matrix = np.stack(
+                [self._entries[key].embedding for key in self._matrix_keys]
+            ).astype(np.float32)
+
+        # One matmul over all cached keys, restricted to matching parameters
+        similarities = self._matrix @ self._normalize(embedding)
+        same_params = np.fromiter(
+            (self._entries[key].params == params for key in self._matrix_keys),
+            dtype=bool, count=len(self._matrix_keys)
+        )
+        similarities[~same_params] = -1.0
+
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+
+        key = self._matrix_keys[best]
+        entry = self._entries[key]
+        if self._is_expired(entry):
+            self._evict(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.results
+
+    def put(self, query_text: Optional[str], embedding, params: Hashable, results: List[Any]):
+        """Store results for a query, evicting the least recently used entry if full"""
+        key_embedding = self._key_embedding(embedding)
+        if query_text is None:
+            key = self._embedding_key(key_embedding, params)
+        else:
+            key = self._text_key(query_text, params)
+        self._entries[key] = _CacheEntry(
+            embedding=key_embedding,
+            params=params,
+            results=results,
+            created_at=time.monotonic()
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._matrix = None
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._entries.clear()
+        self._matrix = None
+        self._matrix_keys = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global cache instance for customer similarity search
+search_cache = SemanticQueryCache(
+    max_entries=settings.search_cache_max_entries,
+    similarity_threshold=settings.search_cache_similarity_threshold,
+    ttl_seconds=settings.search_cache_ttl_seconds
+)
+
+# Global cache instance for vector matching candidates. Matching looks entries
+# up by exact embedding only, since cached similarity scores belong to the
+# embedding they were computed for. The API clears it when customers are
+# created; rows loaded by scripts/import_customers.py or another worker only
+# become visible once entries expire after match_cache_ttl_seconds.
+match_cache = SemanticQueryCache(
+    max_entries=settings.match_cache_max_entries,
+    ttl_seconds=settings.match_cache_ttl_seconds
+)
@@ -1,9 +1,9 @@
 """Test result processing and storage service"""
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func
 
 from app.models.database import TestResult
 from app.models.schemas import TestResultCreate, TestResultResponse
@@ -83,6 +83,44 @@ class TestResultProcessor:
             logger.error(f"Error retrieving test results: {e}")
             return []
     
+    def get_test_results_with_count(
+        self, 
+        test_type: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        db: Session = None
+    ) -> Tuple[List[TestResultResponse], int]:
+        """Retrieve a page of test results together with the total matching count
+        
+        The total is computed with COUNT(*) OVER () in the same query, so
+        pagination needs one round-trip instead of a separate count.
+        """
+        try:
+            query = db.query(TestResult, func.count().over().label("total_count"))
+            
+            if test_type:
+                query = query.filter(TestResult.test_type == test_type)
+            
+            if status:
+                query = query.filter(TestResult.status == status)
+            
+            rows = query.order_by(desc(TestResult.created_date)).offset(offset).limit(limit).all()
+            
+            if rows:
+                total_count = rows[0].total_count
+            elif offset > 0:
+                # Page past the end carries no window value; count separately
+                total_count = query.with_entities(func.count(TestResult.test_id)).scalar() or 0
+            else:
+                total_count = 0
+            
+            return [TestResultResponse.model_validate(row.TestResult) for row in rows], total_count
+            
+        except Exception as e:
+            logger.error(f"Error retrieving test results: {e}")
+            return [], 0
+    
     def update_test_status(self, test_id: int, status: str, error_message: Optional[str] = None, db: Session = None) -> bool:
         """Update test result status"""
         try:
@@ -166,4 +204,13 @@ class TestResultProcessor:
             created_by="system"
         )
         
-        return self.store_test_result(test_data, db) 
\ No newline at end of file
+        return self.store_test_result(test_data, db) 
+
+
+# Global processor instance
+test_result_processor = TestResultProcessor()
+
+
+def get_test_result_processor() -> TestResultProcessor:
+    """Get the global test result processor instance"""
+    return test_result_processor
@@ -8,7 +8,7 @@ import random
 import logging
 from datetime import datetime
 from decimal import Decimal
-from faker import Faker
+from functools import lru_cache
 import numpy as np
 
 # Configure logging
@@ -21,8 +21,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize Faker
-fake = Faker()
+@lru_cache(maxsize=1)
+def get_faker():
+    """Shared Faker instance, created on first use to keep imports fast"""
+    from faker import Faker
+    return Faker()
 
 # Industry options for more realistic data
 INDUSTRIES = [
@@ -32,19 +35,26 @@ INDUSTRIES = [
     "Real Estate", "Automotive", "Aerospace", "Pharmaceuticals", "Media"
 ]
 
-def generate_random_vector(dim=1536):
-    """Generate a random vector with the specified dimension"""
-    # Generate random vector and normalize it
-    vec = np.random.randn(dim)
-    vec = vec / np.linalg.norm(vec)
-    return vec.tolist()
+def generate_random_vectors(count, per_row=2, dim=1536):
+    """Generate count x per_row random unit vectors of the given dimension
+    
+    Returns one float32 array of shape (count, per_row, dim), sampled and
+    normalized in a single vectorized pass.
+    """
+    vectors = np.random.default_rng().standard_normal((count, per_row, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=2, keepdims=True)
+    return vectors
 
 def generate_customer_data(count=1):
     """Generate a list of customer data dictionaries"""
+    fake = get_faker()
     customers = []
     
     logger.info(f"Generating {count} customer records...")
     
+    # Company name and profile embeddings for all customers at once
+    embeddings = generate_random_vectors(count)
+    
     for i in range(count):
         # Generate a realistic company name
         company_name = fake.company()
@@ -71,8 +81,8 @@ def generate_customer_data(count=1):
         }
         
         # Add vector embeddings (as separate files to keep CSV clean)
-        customer["company_name_embedding"] = generate_random_vector(1536)
-        customer["full_profile_embedding"] = generate_random_vector(1536)
+        customer["company_name_embedding"] = embeddings[i, 0].tolist()
+        customer["full_profile_embedding"] = embeddings[i, 1].tolist()
         
         customers.append(customer)
         
@@ -2,15 +2,17 @@
 Script to generate and import customer records for the vector database
 """
 import os
+import io
+import asyncio
 import json
 import csv
-import random
 import logging
 from datetime import datetime
 from decimal import Decimal
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any, Union, Optional
-from faker import Faker
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 import numpy as np
 
@@ -21,7 +23,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.database import SessionLocal, engine, initialize_database, create_tables
-from app.models.database import Customer
+from app.models.database import Customer, halfvec_literal, to_cents
 from app.services.embedding_service import embedding_service
 
 # Configure logging
@@ -34,8 +36,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize Faker
-fake = Faker()
+@lru_cache(maxsize=1)
+def get_faker():
+    """Shared Faker instance, created on first use
+    
+    Importing faker and loading its providers is slow, so runs that only
+    import data from files never pay for it. Unweighted providers are faster
+    and realism of the value distribution does not matter for test data.
+    """
+    from faker import Faker
+    return Faker(use_weighting=False)
+
+# Single NumPy generator for all random draws
+rng = np.random.default_rng()
 
 # Industry options for more realistic data
 INDUSTRIES = [
@@ -45,12 +58,21 @@ INDUSTRIES = [
     "Real Estate", "Automotive", "Aerospace", "Pharmaceuticals", "Media"
 ]
 
-def generate_random_vector(dim=1536):
-    """Generate a random vector with the specified dimension"""
-    # Generate random vector and normalize it
-    vec = np.random.randn(dim)
-    vec = vec / np.linalg.norm(vec)
-    return vec.tolist()
+# Customers written per INSERT statement and transaction
+INSERT_CHUNK_SIZE = 1000
+
+# Largest pool of Faker values sampled for non-identifying fields
+FAKER_POOL_SIZE = 10_000
+
+def generate_random_vectors(count, per_row=2, dim=1536):
+    """Generate count x per_row random unit vectors of the given dimension
+    
+    Returns one float32 array of shape (count, per_row, dim), sampled and
+    normalized in a single vectorized pass.
+    """
+    vectors = rng.standard_normal((count, per_row, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=2, keepdims=True)
+    return vectors
 
 def get_data_dir() -> Path:
     """Get the path to the data directory"""
@@ -107,78 +129,162 @@ def import_customers(source: str, file_format: Optional[str] = None) -> List[Dic
         logger.error(f"Unsupported file format: {file_format}")
         return []
 
+def _faker_pool(generator, size: int) -> List[Any]:
+    """Generate a pool of Faker values to sample from"""
+    return [generator() for _ in range(size)]
+
+def _sample(pool: List[Any], count: int) -> List[Any]:
+    """Draw count values from a pool with replacement"""
+    if not pool:
+        return []
+    return [pool[i] for i in rng.integers(0, len(pool), size=count)]
+
 def generate_customer_data(count=1) -> List[Dict[str, Any]]:
-    """Generate a list of customer data dictionaries"""
-    customers = []
+    """Generate a list of customer data dictionaries
     
-    for _ in range(count):
-        # Generate a realistic company name
-        company_name = fake.company()
-        
-        # Generate other customer fields
-        customer = {
-            "company_name": company_name,
-            "contact_name": fake.name(),
-            "email": fake.company_email(),
-            "phone": fake.phone_number(),
-            "address_line1": fake.street_address(),
-            "address_line2": fake.secondary_address() if random.random() > 0.7 else None,
-            "city": fake.city(),
-            "state_province": fake.state(),
-            "postal_code": fake.postcode(),
-            "country": fake.country(),
-            "industry": random.choice(INDUSTRIES),
-            "annual_revenue": Decimal(str(round(random.uniform(100000, 10000000), 2))),
-            "employee_count": random.randint(5, 10000),
-            "website": f"https://www.{company_name.lower().replace(' ', '').replace(',', '').replace('.', '')}.com",
-            "description": fake.paragraph(nb_sentences=5),
+    Identifying fields (company, contact, email, phone) are generated per
+    customer. Address and description values are sampled from pools of at
+    most FAKER_POOL_SIZE Faker values, and numeric fields are drawn with NumPy
+    in one call per column.
+    """
+    fake = get_faker()
+    pool_size = min(count, FAKER_POOL_SIZE)
+    
+    # Generate realistic identifying fields
+    company_names = [fake.company() for _ in range(count)]
+    contact_names = [fake.name() for _ in range(count)]
+    emails = [fake.company_email() for _ in range(count)]
+    phones = [fake.phone_number() for _ in range(count)]
+    
+    # Sample the remaining text fields from pools
+    address_lines = _sample(_faker_pool(fake.street_address, pool_size), count)
+    secondary_addresses = _sample(_faker_pool(fake.secondary_address, pool_size), count)
+    cities = _sample(_faker_pool(fake.city, pool_size), count)
+    states = _sample(_faker_pool(fake.state, pool_size), count)
+    postal_codes = _sample(_faker_pool(fake.postcode, pool_size), count)
+    countries = _sample(_faker_pool(fake.country, pool_size), count)
+    descriptions = _sample(_faker_pool(lambda: fake.paragraph(nb_sentences=5), pool_size), count)
+    industries = _sample(INDUSTRIES, count)
+    
+    # Numeric fields in one shot
+    has_address_line2 = rng.random(count) > 0.7
+    annual_revenues = rng.uniform(100000, 10000000, size=count)
+    employee_counts = rng.integers(5, 10000, size=count, endpoint=True)
+    
+    return [
+        {
+            "company_name": company_names[i],
+            "contact_name": contact_names[i],
+            "email": emails[i],
+            "phone": phones[i],
+            "address_line1": address_lines[i],
+            "address_line2": secondary_addresses[i] if has_address_line2[i] else None,
+            "city": cities[i],
+            "state_province": states[i],
+            "postal_code": postal_codes[i],
+            "country": countries[i],
+            "industry": industries[i],
+            "annual_revenue": Decimal(f"{annual_revenues[i]:.2f}"),
+            "employee_count": int(employee_counts[i]),
+            "website": f"https://www.{company_names[i].lower().replace(' ', '').replace(',', '').replace('.', '')}.com",
+            "description": descriptions[i],
         }
-        customers.append(customer)
+        for i in range(count)
+    ]
+
+async def embed_all_async(customer_data, embedding_service_instance):
+    """Company name and full profile embeddings for all customers
+    
+    All texts go through one concurrent, batched fan-out on the async client.
+    """
+    company_names = [data["company_name"] for data in customer_data]
+    
+    # Full profile embedding - combine all text fields
+    profile_texts = [
+        f"{data['company_name']} {data.get('description', '')} "
+        f"{data['industry']} {data.get('city', '')} {data.get('country', '')}"
+        for data in customer_data
+    ]
     
-    return customers
+    try:
+        embeddings = await embedding_service_instance.generate_batch_embeddings_async(
+            company_names + profile_texts
+        )
+    finally:
+        await embedding_service_instance.aclose()
+    
+    count = len(customer_data)
+    return list(zip(embeddings[:count], embeddings[count:]))
+
+def _copy_customer_rows(db: Session, rows: List[Dict[str, Any]]):
+    """Write customer rows with COPY ... FROM STDIN in the session's transaction"""
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            halfvec_literal(row[column]) if column.endswith("_embedding")
+            else to_cents(row[column]) if column == "annual_revenue"
+            else row.get(column)
+            for column in columns
+        ])
+    buffer.seek(0)
+    
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {Customer.__table__.fullname} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
 
 def create_customer_records(db: Session, customer_data, embedding_service_instance=None):
-    """Create customer records in the database with embeddings"""
+    """Create customer records in the database with embeddings
+    
+    Rows are written per chunk of INSERT_CHUNK_SIZE customers, bypassing the
+    ORM unit of work. The whole load is one transaction, committed once with
+    synchronous_commit off; each chunk runs in a savepoint so a failing chunk
+    is rolled back on its own. Rows, random or real embeddings alike, are
+    streamed with COPY.
+    """
     created_count = 0
     
-    for data in customer_data:
+    all_embeddings = None
+    if embedding_service_instance:
+        logger.info(f"Generating embeddings for {len(customer_data)} customers...")
+        all_embeddings = asyncio.run(embed_all_async(customer_data, embedding_service_instance))
+    
+    # Bulk load: a crash just after the final commit may lose it, which is acceptable
+    db.execute(text("SET LOCAL synchronous_commit = off"))
+    
+    for start in range(0, len(customer_data), INSERT_CHUNK_SIZE):
+        chunk = customer_data[start:start + INSERT_CHUNK_SIZE]
         try:
-            # Generate embeddings if embedding service is provided
-            if embedding_service_instance:
-                # Company name embedding
-                company_name_embedding = embedding_service_instance.generate_text_embedding(data["company_name"])
-                
-                # Full profile embedding - combine all text fields
-                profile_text = (
-                    f"{data['company_name']} {data.get('description', '')} "
-                    f"{data['industry']} {data.get('city', '')} {data.get('country', '')}"
-                )
-                full_profile_embedding = embedding_service_instance.generate_text_embedding(profile_text)
+            if all_embeddings is not None:
+                embeddings = all_embeddings[start:start + INSERT_CHUNK_SIZE]
             else:
                 # Use random vectors if no embedding service
-                company_name_embedding = generate_random_vector()
-                full_profile_embedding = generate_random_vector()
+                embeddings = generate_random_vectors(len(chunk))
+            
+            rows = [
+                {
+                    **data,
+                    "company_name_embedding": company_name_embedding,
+                    "full_profile_embedding": full_profile_embedding
+                }
+                for data, (company_name_embedding, full_profile_embedding) in zip(chunk, embeddings)
+            ]
             
-            # Create customer record
-            customer = Customer(
-                **data,
-                company_name_embedding=company_name_embedding,
-                full_profile_embedding=full_profile_embedding
-            )
+            with db.begin_nested():
+                _copy_customer_rows(db, rows)
             
-            db.add(customer)
-            created_count += 1
+            created_count += len(rows)
+            logger.info(f"Created {created_count} customer records so far...")
             
-            # Commit in batches to avoid memory issues
-            if created_count % 50 == 0:
-                db.commit()
-                logger.info(f"Created {created_count} customer records so far...")
-                
         except Exception as e:
-            logger.error(f"Error creating customer record: {e}")
-            db.rollback()
+            logger.error(f"Error creating customer records {start}-{start + len(chunk)}: {e}")
     
-    # Final commit for any remaining records
     db.commit()
     logger.info(f"Successfully created {created_count} customer records")
     return created_count
@@ -210,18 +316,16 @@ def main(count=500, use_real_embeddings=False, source=None, file_format=None):
         customer_data = generate_customer_data(count)
     
     # Create customer records in the database
-    db = SessionLocal()
-    try:
-        created_count = create_customer_records(db, customer_data, embedding_service_instance)
-        db.commit()
-        logger.info(f"Successfully created {created_count} customer records")
-        return created_count
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Error creating customer records: {str(e)}")
-        return 0
-    finally:
-        db.close()
+    with SessionLocal() as db:
+        try:
+            created_count = create_customer_records(db, customer_data, embedding_service_instance)
+            db.commit()
+            logger.info(f"Successfully created {created_count} customer records")
+            return created_count
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error creating customer records: {str(e)}")
+            return 0
 
 if __name__ == "__main__":
     import argparse
@@ -26,7 +26,7 @@ env_file_path = os.path.join(os.path.dirname(__file__), '..', 'app', '.env')
 if os.path.exists(env_file_path):
     os.environ['ENV_FILE'] = env_file_path
 
-from sqlalchemy import create_engine, text, func
+from sqlalchemy import create_engine, func, insert, text
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from app.models.database import Customer, IncomingCustomer
@@ -46,7 +46,9 @@ class IncomingCustomerGenerator:
     def __init__(self, db_url: str):
         """Initialize the generator with database connection"""
         self.engine = create_engine(db_url)
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, expire_on_commit=False, bind=self.engine
+        )
         
         # Common company name variations for realistic testing
         self.company_suffixes = [
@@ -328,38 +330,34 @@ class IncomingCustomerGenerator:
         """Save incoming customers to database with embeddings"""
         logger.info(f"Saving {len(incoming_customers)} incoming customers to database")
         
-        saved_customers = []
-        
         try:
+            rows = []
+            for customer_data in incoming_customers:
+                # Remove metadata fields
+                customer_data.pop("base_customer_id", None)
+                customer_data.pop("variation_intensity", None)
+                customer_data.pop("generated_at", None)
+                rows.append(dict(customer_data))
+            
             with self.SessionLocal() as db:
-                for customer_data in incoming_customers:
-                    # Remove metadata fields
-                    base_customer_id = customer_data.pop("base_customer_id", None)
-                    variation_intensity = customer_data.pop("variation_intensity", None)
-                    generated_at = customer_data.pop("generated_at", None)
-                    
-                    # Generate embeddings
-                    company_embedding, profile_embedding = embedding_service.generate_customer_embeddings(
-                        customer_data
-                    )
-                    
-                    # Create incoming customer record
-                    db_incoming = IncomingCustomer(
-                        **customer_data,
+                # Batched embeddings, reusing any cached for identical texts;
+                # new cache entries commit together with the customers
+                embeddings = embedding_service.generate_customer_embeddings_batch(rows, db)
+                
+                for row, (company_embedding, profile_embedding) in zip(rows, embeddings):
+                    row.update(
                         company_name_embedding=company_embedding,
                         full_profile_embedding=profile_embedding,
                         processing_status="pending"
                     )
-                    
-                    db.add(db_incoming)
-                    saved_customers.append(db_incoming)
                 
+                # One INSERT ... RETURNING gives back the records with their IDs
+                saved_customers = db.scalars(
+                    insert(IncomingCustomer).returning(IncomingCustomer, sort_by_parameter_order=True),
+                    rows
+                ).all()
                 db.commit()
                 
-                # Refresh all records to get IDs
-                for customer in saved_customers:
-                    db.refresh(customer)
-                
                 logger.info(f"Successfully saved {len(saved_customers)} incoming customers to database")
                 return saved_customers
                 
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Script to rebuild the customer HNSW indexes with parameters sized to the data"""
+import logging
+import os
+import sys
+
+from sqlalchemy import text
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, engine
+from app.models.hnsw_config import configure_hnsw_params, customer_hnsw_index_ddl
+from app.models.schemas import TestResultCreate
+from app.services.test_result_processor import test_result_processor
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def tune_hnsw_indexes(dry_run: bool = False) -> bool:
+    """Count customer embeddings, pick HNSW parameters and rebuild the indexes
+
+    The chosen parameters are recorded as a test result so later similarity
+    test runs can be matched to the index configuration they ran against.
+    The rebuild runs in autocommit mode because CREATE/DROP INDEX
+    CONCURRENTLY cannot run inside a transaction block.
+    """
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            vector_count = conn.execute(text(
+                "SELECT count(*) FROM customer_data.customers WHERE full_profile_embedding IS NOT NULL"
+            )).scalar()
+            params = configure_hnsw_params(vector_count)
+            logger.info(f"{vector_count} customer embeddings: using {params}")
+
+            statements = customer_hnsw_index_ddl(params)
+            if dry_run:
+                for statement in statements:
+                    logger.info(f"Would execute: {statement}")
+                return True
+
+            conn.execute(text("SET maintenance_work_mem = '1GB'"))
+            for statement in statements:
+                logger.info(f"Executing: {statement[:60]}...")
+                conn.execute(text(statement))
+
+        with SessionLocal() as db:
+            test_result_processor.store_test_result(TestResultCreate(
+                test_name="hnsw_index_tuning",
+                test_type="hnsw_configuration",
+                test_configuration={"vector_count": vector_count, **params},
+                created_by="tune_hnsw_indexes"
+            ), db)
+
+        logger.info(f"✅ HNSW indexes rebuilt; set HNSW_EF_SEARCH={params['ef_search']} for queries")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ HNSW index tuning failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild customer HNSW indexes sized to the data")
+    parser.add_argument("--dry-run", action="store_true", help="Print the DDL without executing it")
+    args = parser.parse_args()
+
+    success = tune_hnsw_indexes(dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
@@ -21,7 +21,7 @@ CREATE TABLE customer_data.customers (
     postal_code VARCHAR(20),
     country VARCHAR(100),
     industry VARCHAR(100),
-    annual_revenue DECIMAL(15,2),
+    annual_revenue BIGINT, -- cents
     employee_count INTEGER,
     website VARCHAR(255),
     description TEXT,
@@ -61,7 +61,7 @@ CREATE TABLE customer_data.incoming_customers (
     postal_code VARCHAR(20),
     country VARCHAR(100),
     industry VARCHAR(100),
-    annual_revenue DECIMAL(15,2),
+    annual_revenue BIGINT, -- cents
     employee_count INTEGER,
     website VARCHAR(255),
     description TEXT,
@@ -95,10 +95,10 @@ CREATE TABLE customer_data.matching_results (
     match_id SERIAL PRIMARY KEY,
     incoming_customer_id INTEGER REFERENCES customer_data.incoming_customers(request_id),
     matched_customer_id INTEGER REFERENCES customer_data.customers(customer_id),
-    similarity_score DECIMAL(5,4),
+    similarity_score REAL,
     match_type VARCHAR(50), -- 'exact', 'high_confidence', 'potential', 'low_confidence'
     match_criteria JSONB, -- Store details about what matched
-    confidence_level DECIMAL(5,4),
+    confidence_level REAL,
     created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     reviewed BOOLEAN DEFAULT FALSE,
     reviewer_notes TEXT
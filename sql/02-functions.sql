@@ -481,7 +481,7 @@ BEGIN
                 DECLARE
                     revenue_ratio DECIMAL;
                 BEGIN
-                    revenue_ratio := LEAST(incoming_record.annual_revenue, customer_record.annual_revenue) / 
+                    revenue_ratio := LEAST(incoming_record.annual_revenue, customer_record.annual_revenue)::numeric / 
                                    GREATEST(incoming_record.annual_revenue, customer_record.annual_revenue);
                     IF revenue_ratio > 0.8 THEN
                         new_confidence := new_confidence * 1.1;
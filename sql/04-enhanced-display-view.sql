@@ -25,7 +25,7 @@ SELECT
     ic.postal_code as incoming_postal_code,
     ic.country as incoming_country,
     ic.industry as incoming_industry,
-    ic.annual_revenue as incoming_revenue,
+    ic.annual_revenue / 100.0 as incoming_revenue,
     ic.employee_count as incoming_employee_count,
     ic.website as incoming_website,
     ic.description as incoming_description,
@@ -46,7 +46,7 @@ SELECT
     c.postal_code as matched_postal_code,
     c.country as matched_country,
     c.industry as matched_industry,
-    c.annual_revenue as matched_revenue,
+    c.annual_revenue / 100.0 as matched_revenue,
     c.employee_count as matched_employee_count,
     c.website as matched_website,
     c.description as matched_description,
@@ -149,8 +149,8 @@ SELECT
         WHEN ic.annual_revenue IS NULL AND c.annual_revenue IS NULL THEN 'missing'
         WHEN ic.annual_revenue IS NULL OR c.annual_revenue IS NULL THEN 'missing'
         WHEN ic.annual_revenue = c.annual_revenue THEN 'exact'
-        WHEN ABS(ic.annual_revenue - c.annual_revenue) / GREATEST(ic.annual_revenue, c.annual_revenue) <= 0.1 THEN 'similar'
-        WHEN ABS(ic.annual_revenue - c.annual_revenue) / GREATEST(ic.annual_revenue, c.annual_revenue) <= 0.25 THEN 'related'
+        WHEN ABS(ic.annual_revenue - c.annual_revenue)::numeric / GREATEST(ic.annual_revenue, c.annual_revenue) <= 0.1 THEN 'similar'
+        WHEN ABS(ic.annual_revenue - c.annual_revenue)::numeric / GREATEST(ic.annual_revenue, c.annual_revenue) <= 0.25 THEN 'related'
         ELSE 'different'
     END as revenue_match,
     
@@ -350,8 +350,8 @@ SELECT
     COUNT(CASE WHEN mr.match_type = 'low_confidence' THEN mr.match_id END) as low_confidence_type_matches,
     
     -- Average metrics
-    ROUND(AVG(mr.confidence_level), 4) as avg_confidence_level,
-    ROUND(AVG(mr.similarity_score), 4) as avg_similarity_score,
+    ROUND(AVG(mr.confidence_level)::numeric, 4) as avg_confidence_level,
+    ROUND(AVG(mr.similarity_score)::numeric, 4) as avg_similarity_score,
     ROUND(AVG(EXTRACT(EPOCH FROM (ic.processed_date - ic.request_date)) * 1000), 2) as avg_processing_time_ms,
     
     -- Date ranges
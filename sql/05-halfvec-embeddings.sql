@@ -0,0 +1,78 @@
+-- Store embeddings as halfvec (16-bit floats)
+-- Run this after 01-setup-pgvector.sql and 02-functions.sql
+--
+-- Requires pgvector 0.7.0+ on the server. halfvec halves the storage, WAL and
+-- HNSW graph size of the 1536-dimension embeddings; cosine distances stay
+-- well within the precision needed for the matching thresholds.
+
+-- Drop the vector HNSW indexes before rewriting the columns
+DROP INDEX IF EXISTS customer_data.idx_customers_company_embedding;
+DROP INDEX IF EXISTS customer_data.idx_customers_profile_embedding;
+DROP INDEX IF EXISTS customer_data.idx_incoming_company_embedding;
+DROP INDEX IF EXISTS customer_data.idx_incoming_profile_embedding;
+
+-- Convert embedding columns to halfvec(1536)
+ALTER TABLE customer_data.customers
+    ALTER COLUMN company_name_embedding TYPE halfvec(1536) USING company_name_embedding::halfvec(1536),
+    ALTER COLUMN full_profile_embedding TYPE halfvec(1536) USING full_profile_embedding::halfvec(1536);
+
+ALTER TABLE customer_data.incoming_customers
+    ALTER COLUMN company_name_embedding TYPE halfvec(1536) USING company_name_embedding::halfvec(1536),
+    ALTER COLUMN full_profile_embedding TYPE halfvec(1536) USING full_profile_embedding::halfvec(1536);
+
+-- Rebuild HNSW indexes with the halfvec operator class
+CREATE INDEX idx_customers_company_embedding ON customer_data.customers
+USING hnsw (company_name_embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX idx_customers_profile_embedding ON customer_data.customers
+USING hnsw (full_profile_embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX idx_incoming_company_embedding ON customer_data.incoming_customers
+USING hnsw (company_name_embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX idx_incoming_profile_embedding ON customer_data.incoming_customers
+USING hnsw (full_profile_embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+-- Recreate the similarity functions with halfvec arguments
+DROP FUNCTION IF EXISTS customer_data.calculate_similarity(vector, vector);
+DROP FUNCTION IF EXISTS customer_data.find_similar_customers(vector, DECIMAL, INTEGER);
+
+CREATE OR REPLACE FUNCTION customer_data.calculate_similarity(
+    customer1_embedding halfvec(1536),
+    customer2_embedding halfvec(1536)
+) RETURNS DECIMAL(5,4) AS $$
+BEGIN
+    RETURN 1 - (customer1_embedding <=> customer2_embedding);
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION customer_data.find_similar_customers(
+    input_embedding halfvec(1536),
+    similarity_threshold DECIMAL(5,4) DEFAULT 0.8,
+    max_results INTEGER DEFAULT 10
+) RETURNS TABLE (
+    customer_id INTEGER,
+    company_name VARCHAR(255),
+    similarity_score DECIMAL(5,4),
+    contact_name VARCHAR(255),
+    email VARCHAR(255),
+    city VARCHAR(100),
+    country VARCHAR(100)
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        c.customer_id,
+        c.company_name,
+        (1 - (c.full_profile_embedding <=> input_embedding))::DECIMAL(5,4) as similarity_score,
+        c.contact_name,
+        c.email,
+        c.city,
+        c.country
+    FROM customer_data.customers c
+    WHERE c.full_profile_embedding IS NOT NULL
+    AND (1 - (c.full_profile_embedding <=> input_embedding)) >= similarity_threshold
+    ORDER BY c.full_profile_embedding <=> input_embedding
+    LIMIT max_results;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,14 @@
+-- Matryoshka-style prefilter column for customer similarity search
+-- Run this after 05-halfvec-embeddings.sql
+--
+-- Stores the L2-normalised first 256 dimensions of full_profile_embedding so
+-- the search endpoint can shortlist candidates on a 6x narrower vector before
+-- re-ranking them with the full embedding.
+
+ALTER TABLE customer_data.customers
+    ADD COLUMN full_profile_embedding_256 halfvec(256) GENERATED ALWAYS AS (
+        l2_normalize(subvector(full_profile_embedding, 1, 256))
+    ) STORED;
+
+CREATE INDEX idx_customers_profile_embedding_256 ON customer_data.customers
+USING hnsw (full_profile_embedding_256 halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
@@ -0,0 +1,15 @@
+-- Indexes for keyset pagination of the bulk match display
+-- Run this after 04-enhanced-display-view.sql
+--
+-- GET /display/matches/bulk orders by (sort field, match_id) and pages with
+-- WHERE (sort field, match_id) < (:last_value, :last_id); these indexes
+-- serve that order directly for the default and date sorts.
+
+CREATE INDEX IF NOT EXISTS idx_matching_results_confidence_keyset
+ON customer_data.matching_results(confidence_level DESC, match_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_matching_results_similarity_keyset
+ON customer_data.matching_results(similarity_score DESC, match_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_matching_results_created_keyset
+ON customer_data.matching_results(created_date DESC, match_id DESC);
@@ -0,0 +1,15 @@
+-- Cache of generated embeddings keyed by model and text hash
+-- Run this after 05-halfvec-embeddings.sql
+--
+-- Customer create endpoints look up the SHA-256 of the canonical company name
+-- and profile text here before calling Azure OpenAI, so resubmitted forms and
+-- re-imported rows skip the embedding round-trip. Keying on the model name
+-- means a deployment change never serves stale vectors.
+
+CREATE TABLE IF NOT EXISTS customer_data.embedding_cache (
+    model_name VARCHAR(100) NOT NULL,
+    text_hash CHAR(64) NOT NULL,
+    embedding halfvec(1536) NOT NULL,
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (model_name, text_hash)
+);
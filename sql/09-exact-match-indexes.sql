@@ -0,0 +1,10 @@
+-- Index for exact email matching
+-- Run this after 01-setup-pgvector.sql
+--
+-- The exact matcher compares emails case-insensitively with
+-- lower(email) = :email; this expression index serves that lookup directly
+-- instead of an ILIKE scan. Phone numbers are compared on their digits, see
+-- 10-phone-digits.sql.
+
+CREATE INDEX IF NOT EXISTS idx_customers_email_lower
+ON customer_data.customers(lower(email));
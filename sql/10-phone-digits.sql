@@ -0,0 +1,13 @@
+-- Generated digits-only phone column for exact matching
+-- Run this after 01-setup-pgvector.sql
+--
+-- The exact matcher normalises the incoming phone to its digits once and
+-- compares it with phone_digits, so differently formatted numbers match and
+-- the lookup is an index scan instead of per-row normalisation.
+
+ALTER TABLE customer_data.customers
+    ADD COLUMN IF NOT EXISTS phone_digits TEXT
+    GENERATED ALWAYS AS (regexp_replace(phone, '\D', '', 'g')) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_customers_phone_digits
+ON customer_data.customers(phone_digits);
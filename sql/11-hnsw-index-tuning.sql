@@ -0,0 +1,24 @@
+-- Rebuild the customer HNSW indexes with larger graph parameters
+-- Run this after 05-halfvec-embeddings.sql and 06-matryoshka-prefilter.sql
+--
+-- m = 16, ef_construction = 64 loses recall once customers grows past
+-- ~100k rows. The searched indexes are rebuilt with m = 24 and
+-- ef_construction = 128; queries raise hnsw.ef_search per transaction
+-- (settings.hnsw_ef_search). incoming_customers indexes are unchanged.
+-- A larger maintenance_work_mem keeps the graph build in memory.
+-- scripts/tune_hnsw_indexes.py rebuilds the same indexes with parameters
+-- chosen from the current row count (app/models/hnsw_config.py).
+
+SET maintenance_work_mem = '1GB';
+
+DROP INDEX IF EXISTS customer_data.idx_customers_company_embedding;
+CREATE INDEX idx_customers_company_embedding ON customer_data.customers
+USING hnsw (company_name_embedding halfvec_cosine_ops) WITH (m = 24, ef_construction = 128);
+
+DROP INDEX IF EXISTS customer_data.idx_customers_profile_embedding;
+CREATE INDEX idx_customers_profile_embedding ON customer_data.customers
+USING hnsw (full_profile_embedding halfvec_cosine_ops) WITH (m = 24, ef_construction = 128);
+
+DROP INDEX IF EXISTS customer_data.idx_customers_profile_embedding_256;
+CREATE INDEX idx_customers_profile_embedding_256 ON customer_data.customers
+USING hnsw (full_profile_embedding_256 halfvec_cosine_ops) WITH (m = 24, ef_construction = 128);
@@ -0,0 +1,43 @@
+-- Store match scores as REAL instead of DECIMAL(5,4)
+-- Run this after 04-enhanced-display-view.sql, then run 04 again
+--
+-- Similarity and confidence scores come from float32 cosine distances, so
+-- numeric's arbitrary precision buys nothing. REAL is 4 bytes and compares
+-- and sorts in hardware, which matters for the ORDER BY / keyset scans over
+-- matching_results. The views depending on the columns are dropped first;
+-- v_customer_matches is recreated here, the display views by re-running 04.
+
+BEGIN;
+
+DROP VIEW IF EXISTS customer_data.v_matching_summary;
+DROP VIEW IF EXISTS customer_data.v_detailed_matches;
+DROP VIEW IF EXISTS customer_data.v_customer_matches;
+
+ALTER TABLE customer_data.matching_results
+    ALTER COLUMN similarity_score TYPE REAL USING similarity_score::real,
+    ALTER COLUMN confidence_level TYPE REAL USING confidence_level::real;
+
+CREATE OR REPLACE VIEW customer_data.v_customer_matches AS
+SELECT 
+    mr.match_id,
+    mr.incoming_customer_id,
+    ic.company_name as incoming_company,
+    ic.contact_name as incoming_contact,
+    ic.email as incoming_email,
+    mr.matched_customer_id,
+    c.company_name as matched_company,
+    c.contact_name as matched_contact,
+    c.email as matched_email,
+    mr.similarity_score,
+    mr.match_type,
+    mr.confidence_level,
+    mr.match_criteria,
+    mr.created_date,
+    mr.reviewed,
+    mr.reviewer_notes
+FROM customer_data.matching_results mr
+JOIN customer_data.incoming_customers ic ON mr.incoming_customer_id = ic.request_id
+JOIN customer_data.customers c ON mr.matched_customer_id = c.customer_id
+ORDER BY mr.similarity_score DESC;
+
+COMMIT;
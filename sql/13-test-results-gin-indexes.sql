@@ -0,0 +1,12 @@
+-- GIN indexes on test result JSONB columns
+-- Run this after 03-create-test-results-table.sql
+--
+-- Dashboards slice test runs by their parameters and metrics with JSONB
+-- containment, e.g. execution_metrics @> '{"stage": "embed"}'. GIN indexes
+-- turn those lookups into index scans instead of reading every run.
+
+CREATE INDEX IF NOT EXISTS idx_test_results_configuration_gin
+ON customer_data.test_results USING gin (test_configuration);
+
+CREATE INDEX IF NOT EXISTS idx_test_results_execution_metrics_gin
+ON customer_data.test_results USING gin (execution_metrics);
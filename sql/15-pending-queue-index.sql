@@ -0,0 +1,11 @@
+-- Partial index over pending incoming customers
+-- Run this after 01-setup-pgvector.sql
+--
+-- Only a small slice of incoming_customers is pending at any time, and the
+-- full processing_status index is rarely chosen for it. This index holds just
+-- that slice ordered by request_date, so pending counts and oldest-first
+-- dequeues read a few pages.
+
+CREATE INDEX IF NOT EXISTS idx_incoming_customers_pending
+ON customer_data.incoming_customers(request_date)
+WHERE processing_status = 'pending';
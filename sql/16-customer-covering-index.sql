@@ -0,0 +1,10 @@
+-- Covering index for matched customer lookups
+-- Run this after 01-setup-pgvector.sql
+--
+-- Match results join customers by customer_id for company_name,
+-- contact_name and email only. Matched ids arrive in similarity order and
+-- are scattered across the heap; with these columns in the index the join
+-- is an index-only scan instead of one random heap page per match.
+
+CREATE INDEX IF NOT EXISTS idx_customers_match_display
+ON customer_data.customers(customer_id) INCLUDE (company_name, contact_name, email);
@@ -0,0 +1,139 @@
+"""
+Embedding Cache Tests
+
+This module tests the in-process embedding cache, which lets repeated texts
+skip the Azure OpenAI round-trip, and the customer profile text whose exact
+wording the cached embeddings are keyed on.
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from pgvector import HalfVector
+
+from app.models.database import Cents
+from app.services.embedding_service import EmbeddingService, LocalEmbeddingCache
+
+
+class FakeEmbeddings:
+    """Stand-in for the OpenAI embeddings resource that counts requested texts"""
+
+    def __init__(self):
+        self.requested = []
+
+    def create(self, input, model):
+        self.requested.extend(input)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text))]) for text in input])
+
+
+class TestLocalEmbeddingCache:
+    """Test suite for the in-process embedding cache"""
+
+    @pytest.fixture
+    def cache(self):
+        """Create a small cache instance for testing"""
+        return LocalEmbeddingCache(max_entries=2)
+
+    def test_hit_ignores_whitespace(self, cache):
+        """Texts differing only in whitespace share an entry"""
+        cache.put("Acme  Corp\n", [0.5, 0.25])
+
+        assert cache.get("Acme Corp") == [0.5, 0.25]
+        assert cache.get("acme corp") is None
+
+    def test_least_recently_used_is_evicted(self, cache):
+        """The oldest unused entry is dropped when the cache is full"""
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+        cache.put("c", [3.0])
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+
+    def test_cache_info_counts_hits_and_misses(self, cache):
+        """Lookups are counted and clear resets the counters"""
+        cache.put("a", [1.0])
+        cache.get("a")
+        cache.get("b")
+
+        assert cache.cache_info() == {"hits": 1, "misses": 1, "maxsize": 2, "currsize": 1}
+
+        cache.clear()
+        assert cache.cache_info()["hits"] == 0
+
+    def test_batch_requests_only_uncached_texts(self, monkeypatch):
+        """Batch generation sends each uncached text to the API once"""
+        monkeypatch.setattr(EmbeddingService, "_prepare_text", staticmethod(lambda text: text))
+        service = EmbeddingService()
+        service.local_cache = LocalEmbeddingCache(max_entries=10)
+        fake = FakeEmbeddings()
+        service.client = SimpleNamespace(embeddings=fake)
+
+        first = service.generate_batch_embeddings(["one", "three", "one"])
+        second = service.generate_batch_embeddings(["three", "seven"])
+
+        assert first == [[3.0], [5.0], [3.0]]
+        assert second == [[5.0], [5.0]]
+        assert fake.requested == ["one", "three", "seven"]
+
+    def test_table_hits_skip_the_api(self, monkeypatch):
+        """Texts stored in the embedding cache table are not requested again"""
+        monkeypatch.setattr(EmbeddingService, "_prepare_text", staticmethod(lambda text: text))
+        service = EmbeddingService()
+        service.local_cache = LocalEmbeddingCache(max_entries=10)
+        fake = FakeEmbeddings()
+        service.client = SimpleNamespace(embeddings=fake)
+        stored_hash = service._text_hash("stored")
+        inserted = []
+
+        class FakeSession:
+            def execute(self, statement, params=None):
+                if params is not None:
+                    inserted.extend(params)
+                return SimpleNamespace(all=lambda: [(stored_hash, HalfVector([9.0]))])
+
+        embeddings = service.generate_embeddings_cached(["stored", "new"], FakeSession())
+
+        assert embeddings == [[9.0], [3.0]]
+        assert fake.requested == ["new"]
+        assert [row["text_hash"] for row in inserted] == [service._text_hash("new")]
+
+
+class TestCustomerProfileText:
+    """Test suite for the customer profile text sent for embedding"""
+
+    def test_profile_text_format(self):
+        """Fields appear in a fixed order and empty values are skipped"""
+        customer = {
+            "company_name": "Acme Corp",
+            "industry": "Retail",
+            "email": "",
+            "address_line1": "1 Main St",
+            "address_line2": None,
+            "city": "Springfield",
+            "country": "USA",
+            "annual_revenue": Decimal("1234567.5"),
+            "employee_count": 42,
+        }
+
+        text = EmbeddingService()._build_customer_profile_text(customer)
+
+        assert text == (
+            "Company: Acme Corp | Industry: Retail | Address: 1 Main St Springfield USA"
+            " | Annual Revenue: $1,234,567.50 | Employees: 42"
+        )
+
+    def test_revenue_cents_round_trip_keeps_profile_text(self):
+        """Revenue stored as cents loads back as the same two-place Decimal"""
+        revenue_type = Cents()
+        stored = revenue_type.process_bind_param(Decimal("1234567.5"), None)
+        loaded = revenue_type.process_result_value(stored, None)
+
+        assert stored == 123456750
+        assert loaded == Decimal("1234567.50")
+        assert EmbeddingService()._build_customer_profile_text({"annual_revenue": loaded}) == (
+            "Annual Revenue: $1,234,567.50"
+        )
@@ -17,6 +17,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from app.services.matching.exact_matcher import ExactMatcher
+from app.services.matching.utils import MatchingUtils
 from app.models.database import Customer, IncomingCustomer
 from app.core.database import get_db
 
@@ -109,11 +110,26 @@ class TestExactMatching:
         
         # Test exact match using the new matcher's criteria building
         criteria = exact_matcher._build_exact_criteria(incoming_customer)
-        result = 'phone' in criteria and criteria['phone'] == customer.phone.strip()
+        result = 'phone' in criteria and criteria['phone'] == MatchingUtils.normalize_phone(customer.phone)
         
         assert result is True
         logger.info("✅ Exact phone match test passed")
 
+    def test_phone_matches_on_digits(self, exact_matcher, sample_customer, sample_incoming_customer):
+        """Phones formatted differently match on their digits"""
+        customer = Customer(**{**sample_customer, "phone": "(1) 555 123 4567"})
+        incoming_customer = IncomingCustomer(**sample_incoming_customer)
+        
+        criteria = exact_matcher._build_exact_criteria(incoming_customer)
+        
+        assert criteria['phone'] == "15551234567"
+        assert criteria['phone'] == MatchingUtils.normalize_phone(customer.phone)
+        
+        # A phone without digits adds no criterion
+        no_digits = IncomingCustomer(**{**sample_incoming_customer, "phone": "n/a"})
+        assert 'phone' not in exact_matcher._build_exact_criteria(no_digits)
+        logger.info("✅ Phone digits match test passed")
+
     def test_multiple_field_match(self, exact_matcher, sample_customer, sample_incoming_customer):
         """Test when multiple fields match exactly"""
         # Create customer and incoming customer with multiple exact matches
@@ -124,7 +140,7 @@ class TestExactMatching:
         criteria = exact_matcher._build_exact_criteria(incoming_customer)
         company_match = 'company_name' in criteria and criteria['company_name'] == customer.company_name.lower().strip()
         email_match = 'email' in criteria and criteria['email'] == customer.email.lower().strip()
-        phone_match = 'phone' in criteria and criteria['phone'] == customer.phone.strip()
+        phone_match = 'phone' in criteria and criteria['phone'] == MatchingUtils.normalize_phone(customer.phone)
         
         assert company_match is True
         assert email_match is True
@@ -227,6 +243,21 @@ class TestExactMatching:
         assert 0.8 <= score <= 1.0, f"Confidence score {score} not in expected range"
         logger.info(f"✅ Exact match confidence test passed: {score}")
 
+    def test_score_table_weights_matched_fields(self, exact_matcher):
+        """Each field mask scores its matched weights over the weights of the criteria"""
+        criteria = {'company_name': 'acme', 'email': 'info@acme.com', 'phone': '555-0100'}
+        table = exact_matcher._score_table(criteria)
+        
+        assert table[0] == 0.0
+        assert table[1] == pytest.approx(0.4)  # Company name only
+        assert table[2 | 4] == pytest.approx(0.6)  # Email and phone
+        assert table[7] == pytest.approx(1.0)
+        
+        # Fields missing from the incoming customer carry no weight
+        assert exact_matcher._score_table({'company_name': 'acme'})[1] == pytest.approx(1.0)
+        
+        logger.info("✅ Score table test passed")
+
     def test_no_exact_match(self, exact_matcher, sample_customer):
         """Test when no exact match is found"""
         # Test with different company names
@@ -0,0 +1,40 @@
+"""
+HNSW Configuration Tests
+
+This module tests the size-adaptive HNSW parameters used when rebuilding the
+customer embedding indexes.
+"""
+
+from app.models.hnsw_config import CUSTOMER_HNSW_INDEXES, configure_hnsw_params, customer_hnsw_index_ddl
+
+
+class TestHnswConfig:
+    """Test suite for HNSW parameter selection"""
+
+    def test_params_grow_with_vector_count(self):
+        """Each size band gets a denser graph and wider search list"""
+        assert configure_hnsw_params(0) == {"m": 16, "ef_construction": 64, "ef_search": 40}
+        assert configure_hnsw_params(99_999)["m"] == 16
+        assert configure_hnsw_params(100_000) == {"m": 24, "ef_construction": 128, "ef_search": 100}
+        assert configure_hnsw_params(5_000_000) == {"m": 32, "ef_construction": 200, "ef_search": 200}
+
+    def test_index_ddl_uses_params(self):
+        """Every customer index is rebuilt concurrently with the chosen parameters"""
+        statements = customer_hnsw_index_ddl(configure_hnsw_params(250_000))
+
+        assert len(statements) == 4 * len(CUSTOMER_HNSW_INDEXES)
+        assert statements[1] == (
+            "CREATE INDEX CONCURRENTLY idx_customers_company_embedding_new ON customer_data.customers "
+            "USING hnsw (company_name_embedding halfvec_cosine_ops) WITH (m = 24, ef_construction = 128)"
+        )
+
+    def test_index_ddl_swaps_in_new_index(self):
+        """The old index is dropped only after its replacement is built"""
+        statements = customer_hnsw_index_ddl(configure_hnsw_params(0))[:4]
+
+        assert statements == [
+            "DROP INDEX CONCURRENTLY IF EXISTS customer_data.idx_customers_company_embedding_new",
+            statements[1],
+            "DROP INDEX CONCURRENTLY IF EXISTS customer_data.idx_customers_company_embedding",
+            "ALTER INDEX customer_data.idx_customers_company_embedding_new RENAME TO idx_customers_company_embedding",
+        ]
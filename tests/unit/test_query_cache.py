@@ -0,0 +1,87 @@
+"""
+Semantic Query Cache Tests
+
+This module tests the similarity search result cache, which serves repeated
+queries by normalised text and near-duplicate queries by embedding similarity,
+and which also caches vector matching candidates keyed by the exact embedding.
+"""
+
+import numpy as np
+import pytest
+
+from app.services.query_cache import SemanticQueryCache
+
+
+class TestSemanticQueryCache:
+    """Test suite for the semantic query cache"""
+
+    @pytest.fixture
+    def cache(self):
+        """Create a small cache instance for testing"""
+        return SemanticQueryCache(max_entries=2, similarity_threshold=0.97, ttl_seconds=60)
+
+    @pytest.fixture
+    def embedding(self):
+        """Random unit embedding"""
+        rng = np.random.default_rng(42)
+        vector = rng.standard_normal(1536).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def test_text_hit_ignores_case_and_whitespace(self, cache, embedding):
+        """Identical queries after normalisation hit without an embedding"""
+        cache.put("Cloud  Software", embedding, (0.8, 10), ["result"])
+
+        assert cache.get_by_text("cloud software", (0.8, 10)) == ["result"]
+        assert cache.get_by_text("cloud software", (0.7, 10)) is None
+
+    def test_similar_embedding_hit(self, cache, embedding):
+        """Near-duplicate embeddings reuse cached results"""
+        cache.put("cloud software", embedding, (0.8, 10), ["result"])
+
+        nearby = embedding + 0.001 * np.ones_like(embedding)
+        assert cache.get_similar(nearby, (0.8, 10)) == ["result"]
+        assert cache.get_similar(nearby, (0.9, 10)) is None
+
+    def test_dissimilar_embedding_miss(self, cache, embedding):
+        """Unrelated embeddings do not hit"""
+        cache.put("cloud software", embedding, (0.8, 10), ["result"])
+
+        assert cache.get_similar(-embedding, (0.8, 10)) is None
+
+    def test_lru_eviction(self, cache, embedding):
+        """Least recently used entry is evicted when full"""
+        cache.put("first", embedding, (0.8, 10), ["first"])
+        cache.put("second", -embedding, (0.8, 10), ["second"])
+        cache.get_by_text("first", (0.8, 10))
+        cache.put("third", np.roll(embedding, 1), (0.8, 10), ["third"])
+
+        assert len(cache) == 2
+        assert cache.get_by_text("second", (0.8, 10)) is None
+        assert cache.get_by_text("first", (0.8, 10)) == ["first"]
+
+    def test_expired_entries_miss(self, embedding):
+        """Entries older than the TTL are not served"""
+        cache = SemanticQueryCache(ttl_seconds=-1)
+        cache.put("cloud software", embedding, (0.8, 10), ["result"])
+
+        assert cache.get_by_text("cloud software", (0.8, 10)) is None
+        assert cache.get_similar(embedding, (0.8, 10)) is None
+
+    def test_entries_without_text_keyed_by_embedding(self, cache, embedding):
+        """Entries stored without query text neither collide nor hit by text"""
+        cache.put(None, embedding, (0.7, 5), ["first"])
+        cache.put(None, -embedding, (0.7, 5), ["second"])
+
+        assert len(cache) == 2
+        assert cache.get_similar(embedding, (0.7, 5)) == ["first"]
+        assert cache.get_similar(-embedding, (0.7, 5)) == ["second"]
+
+    def test_embedding_lookup_requires_exact_embedding(self, cache, embedding):
+        """Exact embedding lookups never serve another embedding's scores"""
+        cache.put(None, embedding, (0.7, 5), ["first"])
+
+        nearby = embedding + 0.001 * np.ones_like(embedding)
+        assert cache.get_similar(nearby, (0.7, 5)) == ["first"]
+        assert cache.get_by_embedding(nearby, (0.7, 5)) is None
+        assert cache.get_by_embedding(embedding, (0.7, 5)) == ["first"]
+        assert cache.get_by_embedding(embedding, (0.8, 5)) is None
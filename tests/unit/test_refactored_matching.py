@@ -2,6 +2,7 @@
 import pytest
 from unittest.mock import Mock, MagicMock
 from datetime import datetime
+from types import SimpleNamespace
 
 from app.services.matching import (
     MatchingService, 
@@ -11,8 +12,9 @@ from app.services.matching import (
     BusinessRulesEngine,
     ResultProcessor
 )
-from app.models.database import IncomingCustomer
+from app.models.database import Customer, IncomingCustomer
 from app.models.schemas import MatchResult as MatchResultSchema
+from app.services.matching.fuzzy_matcher import company_name_index
 
 
 class TestRefactoredMatching:
@@ -178,4 +180,94 @@ class TestRefactoredMatching:
         
         # Should return a float between 0 and 1
         assert isinstance(confidence, float)
-        assert 0 <= confidence <= 1 
\ No newline at end of file
+        assert 0 <= confidence <= 1 
+    
+    def test_business_rules_specialised_per_incoming_customer(self, monkeypatch):
+        """Rules built once for an incoming customer score every candidate like apply_rules"""
+        monkeypatch.setattr("app.core.config.settings.enable_business_rules", True)
+        monkeypatch.setattr("app.core.config.settings.revenue_size_boost", True)
+        engine = BusinessRulesEngine()
+        incoming_customer = Mock(industry="Technology", country="USA", annual_revenue=1000000)
+        rows = [
+            Mock(industry="technology", country="usa", annual_revenue=900000),
+            Mock(industry="Retail", country="Canada", annual_revenue=None),
+            Mock(industry=None, country=None, annual_revenue=0),
+        ]
+        
+        apply_rules = engine.rules_for(incoming_customer)
+        
+        for row in rows:
+            assert apply_rules(0.5, row) == engine.apply_rules(0.5, incoming_customer, row)
+        assert apply_rules(0.5, rows[0]) == pytest.approx(0.5 * 1.2 * 1.1 * 1.1)
+        assert apply_rules(0.5, rows[1]) == pytest.approx(0.5 * 0.8)
+        
+        monkeypatch.setattr("app.core.config.settings.enable_business_rules", False)
+        assert engine.rules_for(incoming_customer)(0.5, rows[0]) == 0.5
+    
+    def test_result_processor_writes_batch_in_one_statement(self):
+        """Matches of every request are stored by one statement and get their match ids"""
+        processor = ResultProcessor()
+        matches = {
+            1: [MatchResultSchema(
+                match_id=0, matched_customer_id=123, matched_company_name="Test Company",
+                matched_contact_name=None, matched_email=None, similarity_score=0.9,
+                match_type="high_confidence", confidence_level=0.9,
+                match_criteria={"exact_match": True}, created_date=datetime.now()
+            )],
+            2: [],
+        }
+        db = MagicMock()
+        db.execute.return_value.all.return_value = [
+            SimpleNamespace(match_id=41, incoming_customer_id=1, matched_customer_id=123)
+        ]
+        
+        assert processor.store_batch_results(matches, db, commit=False)
+        
+        params = db.execute.call_args[0][1]
+        assert db.execute.call_count == 1
+        assert params["request_ids"] == [1, 2]
+        assert params["match_criteria"] == ['{"exact_match":true}']
+        assert matches[1][0].match_id == 41
+    
+    def test_fuzzy_matcher_scores_cached_name_index(self):
+        """Fuzzy matching ranks the cached names and loads only the hits"""
+        company_name_index.clear()
+        customers = [
+            Customer(customer_id=1, company_name="Acme Corporation", contact_name="A", email="a@acme.com"),
+            Customer(customer_id=2, company_name="Globex", contact_name="G", email="g@globex.com"),
+            Customer(customer_id=3, company_name="ACME Corp", contact_name="B", email="b@acme.com"),
+        ]
+        db = MagicMock()
+        db.execute.return_value.all.return_value = [(c.customer_id, c.company_name) for c in customers]
+        db.query.return_value.options.return_value.filter.return_value = [customers[2]]
+        
+        matches = FuzzyMatcher().find_matches(IncomingCustomer(company_name="Acme Corp"), db)
+        FuzzyMatcher().find_matches(IncomingCustomer(company_name="Acme Corp"), db)
+        
+        assert [m.matched_customer_id for m in matches] == [3]
+        assert matches[0].similarity_score == 1.0
+        assert db.execute.call_count == 1  # Names loaded once, then served from the index
+    
+    def test_fuzzy_matcher_threshold_on_known_pairs(self, monkeypatch):
+        """fuzz.ratio scores pin which names clear the 0.8 threshold"""
+        monkeypatch.setattr("app.services.matching.fuzzy_matcher.settings.fuzzy_similarity_threshold", 0.8)
+        company_name_index.clear()
+        customers = [
+            Customer(customer_id=1, company_name="Fernandez-Hernandez"),  # 0.94 (difflib: 0.50)
+            Customer(customer_id=2, company_name="Williams Group"),  # 0.81 (difflib: 0.67)
+            Customer(customer_id=3, company_name="Acme Corporation"),  # 0.72 under either scorer
+        ]
+        db = MagicMock()
+        db.execute.return_value.all.return_value = [(c.customer_id, c.company_name) for c in customers]
+        db.query.return_value.options.return_value.filter.return_value = customers[:2]
+        
+        matches = FuzzyMatcher().find_matches(IncomingCustomer(company_name="Fernanez-Hrnandez"), db)
+        assert [m.matched_customer_id for m in matches] == [1]
+        assert matches[0].similarity_score == pytest.approx(0.9444, abs=1e-4)
+        
+        matches = FuzzyMatcher().find_matches(IncomingCustomer(company_name="Willasg Iroup"), db)
+        assert [m.matched_customer_id for m in matches] == [2]
+        assert matches[0].similarity_score == pytest.approx(0.8148, abs=1e-4)
+        
+        assert FuzzyMatcher().find_matches(IncomingCustomer(company_name="Acme Corp"), db) == []
+        company_name_index.clear()
@@ -23,6 +23,7 @@ from app.models.database import Customer, IncomingCustomer
 from app.models.schemas import MatchResult
 from app.core.database import get_db
 from app.core.config import settings
+from app.services.query_cache import match_cache
 
 # Configure logging for tests
 logging.basicConfig(level=logging.INFO)
@@ -35,6 +36,7 @@ class TestVectorMatching:
     @pytest.fixture
     def vector_matcher(self):
         """Create a vector matcher instance for testing"""
+        match_cache.clear()
         return VectorMatcher()
     
     @pytest.fixture
@@ -309,6 +311,48 @@ class TestVectorMatching:
         
         logger.info("✅ Embedding dimensions test passed")
 
+    def test_halfvec_embedding_preparation(self, vector_matcher):
+        """Test that halfvec embeddings loaded from the database are prepared"""
+        from pgvector import HalfVector
+        
+        embedding = HalfVector([0.6, 0.8] + [0.0] * 1534)
+        prepared = vector_matcher._prepare_embedding(embedding)
+        
+        assert isinstance(prepared, list)
+        assert len(prepared) == 1536
+        assert abs(prepared[0] - 0.6) < 1e-3
+        
+        logger.info("✅ Halfvec embedding preparation test passed")
+
+    def test_halfvec_literal_round_trip(self):
+        """Test that compact halfvec literals parse back to the same float16 values"""
+        from app.models.database import halfvec_literal
+
+        embedding = np.random.default_rng(0).standard_normal(1536).astype(np.float32)
+        embedding /= np.linalg.norm(embedding)
+        literal = halfvec_literal(embedding.tolist())
+
+        parsed = np.array(literal[1:-1].split(","), dtype=np.float64).astype(np.float16)
+        assert np.array_equal(parsed, embedding.astype(np.float16))
+        assert len(literal) < 10 * len(embedding)
+
+        logger.info("✅ Halfvec literal round-trip test passed")
+
+    def test_halfvec_binds_binary_on_asyncpg(self):
+        """Test that asyncpg binds HalfVector values for the binary codec"""
+        from pgvector import HalfVector
+        from sqlalchemy.dialects.postgresql import asyncpg, psycopg2
+        from app.models.database import HalfVec
+
+        async_bind = HalfVec(3).bind_processor(asyncpg.dialect())
+        sync_bind = HalfVec(3).bind_processor(psycopg2.dialect())
+
+        assert async_bind([0.5, 0.25, 1.0]) == HalfVector([0.5, 0.25, 1.0])
+        assert async_bind(None) is None
+        assert sync_bind([0.5, 0.25, 1.0]) == "[0.5,0.25,1]"
+
+        logger.info("✅ Halfvec asyncpg bind test passed")
+
     @pytest.mark.integration
     def test_vector_match_with_database(self, vector_matcher):
         """Integration test with actual database"""
@@ -366,6 +410,40 @@ class TestVectorMatching:
         
         logger.info(f"✅ Business rules application test passed - Confidence: {confidence}")
 
+    def test_repeated_embedding_served_from_cache(self, vector_matcher, sample_incoming_customer):
+        """A recently matched embedding does not query the database again"""
+        incoming_customer = IncomingCustomer(**sample_incoming_customer)
+        mock_result = Mock(customer_id=1, company_name="Microsoft Corporation", contact_name="John Doe",
+                           email="john.doe@microsoft.com", similarity_score=0.85, annual_revenue=None)
+        mock_db = Mock()
+        mock_db.execute.return_value.fetchall.return_value = [mock_result]
+        
+        first = vector_matcher.find_matches(incoming_customer, mock_db)
+        second = vector_matcher.find_matches(incoming_customer, mock_db)
+        
+        assert mock_db.execute.call_count == 1
+        assert [m.matched_customer_id for m in second] == [m.matched_customer_id for m in first]
+        
+        logger.info("✅ Match cache test passed")
+
+    def test_batch_matching_uses_one_query(self, vector_matcher, sample_incoming_customer):
+        """Cache misses in a batch share one query and rows are grouped per customer"""
+        first = IncomingCustomer(**{**sample_incoming_customer, "request_id": 1})
+        second = IncomingCustomer(**{**sample_incoming_customer, "request_id": 2,
+                                     "full_profile_embedding": [-0.1] * 1536})
+        row = Mock(ord=2, customer_id=7, company_name="Contoso", contact_name="Jane Roe",
+                   email="jane@contoso.com", similarity_score=0.9, annual_revenue=None)
+        mock_db = Mock()
+        mock_db.execute.return_value.fetchall.return_value = [row]
+        
+        matches = vector_matcher.find_matches_batch([first, second], mock_db)
+        
+        assert mock_db.execute.call_count == 1
+        assert matches[1] == []
+        assert [m.matched_customer_id for m in matches[2]] == [7]
+        
+        logger.info("✅ Batch vector matching test passed")
+
     def test_match_criteria_inclusion(self, vector_matcher, sample_customer, sample_incoming_customer):
         """Test that match criteria includes vector-specific information"""
         customer = Customer(**sample_customer)